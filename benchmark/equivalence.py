@@ -0,0 +1,134 @@
+"""
+Equivalence check of the fast filtering code against the implementations it replaced.
+
+Fuzzes the Aho-Corasick keyword matcher against the case-insensitive regex
+alternation, with keywords and texts drawn from characters whose case
+folding is irregular (dotless i, final sigma, long s, Kelvin sign, ...),
+and the lxml HTML cleaner against the BeautifulSoup cleaner, with random
+documents truncated at random points the way feeds cut articles off.
+
+Fails (exit code 1) on the first disagreements found.
+
+Usage:
+    python benchmark/equivalence.py [--cases 20000] [--seed 0]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.filter import (AUTOMATON_MIN_KEYWORDS, KeywordMatcher,  # noqa: E402
+                        clean_html_lxml)
+
+# Plain letters plus characters that `re.IGNORECASE` matches beyond `str.lower()`
+ALPHABET = "abikstσςΣοδΟΔıIİiſSKkµμΜβϐθϑﬅﬆßẞǅǄǆ苹果 "
+
+# Tags the cleaner keeps, drops and ignores
+HTML_TAGS = ["p", "h1", "h3", "li", "ul", "div", "span", "b", "a", "script", "style", "img", "aside"]
+
+# Documents that ended up cut off in real feeds
+TRUNCATED_HTML = [
+    "<p>first</p><p>second paragraph cut off by the feed...",
+    "<li>a<li>b",
+    "<ul><li>a<li>b<p>c",
+    "<p>a<script>b",
+    "<div><p>text <b>bold",
+]
+
+
+def random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def check_keywords(cases: int, seed: int) -> List[str]:
+    """
+    Compare the keyword matcher with the regex it replaced on random inputs.
+
+    Returns:
+        A description of every disagreement
+    """
+    rng = random.Random(seed)
+    failures = []
+    for _ in range(cases):
+        keywords = [random_text(rng, rng.randint(1, 4))
+                    for _ in range(rng.randint(AUTOMATON_MIN_KEYWORDS, 2 * AUTOMATON_MIN_KEYWORDS))]
+        text = random_text(rng, rng.randint(0, 40))
+        expected = re.search("|".join(map(re.escape, keywords)), text, re.IGNORECASE) is not None
+        if KeywordMatcher(keywords).search(text) != expected:
+            failures.append(f"keywords {keywords!r} on {text!r}: regex says {expected}")
+    return failures
+
+
+def reference_clean(html: str) -> str:
+    """The BeautifulSoup cleaner `clean_html_lxml` replaced."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup.select('script, style, img, svg, iframe, form, nav, header, footer, aside'):
+        tag.decompose()
+    lines = [element.get_text(strip=True) for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'li'])]
+    lines = [line for line in lines if line]
+    if not lines:
+        return soup.get_text(separator=' ', strip=True)
+    return '\n'.join(lines)
+
+
+def random_html(rng: random.Random, depth: int = 0) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        if depth < 3 and rng.random() < 0.6:
+            tag = rng.choice(HTML_TAGS)
+            # Leave some tags unclosed, like sloppy feed HTML does
+            end = f"</{tag}>" if rng.random() < 0.8 else ""
+            parts.append(f"<{tag}>{random_html(rng, depth + 1)}{end}")
+        else:
+            parts.append(random_text(rng, rng.randint(0, 8)))
+    return "".join(parts)
+
+
+def check_cleaner(cases: int, seed: int) -> List[str]:
+    """
+    Compare the lxml cleaner with the BeautifulSoup cleaner on truncated documents.
+
+    Returns:
+        A description of every disagreement
+    """
+    rng = random.Random(seed)
+    documents = list(TRUNCATED_HTML)
+    for _ in range(cases - len(documents)):
+        html = random_html(rng)
+        documents.append(html[:rng.randint(1, len(html))] if html else html)
+
+    failures = []
+    for html in documents:
+        if not html.strip():
+            continue
+        expected = reference_clean(html)
+        actual = clean_html_lxml(html)
+        if actual != expected:
+            failures.append(f"cleaning {html!r}: got {actual!r}, BeautifulSoup gives {expected!r}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the fast filters against the reference code")
+    parser.add_argument("--cases", type=int, default=20000, help="Random cases per check")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    failed = False
+    for name, check in (("keyword matcher", check_keywords), ("HTML cleaner", check_cleaner)):
+        failures = check(args.cases, args.seed)
+        print(f"{name}: {args.cases - len(failures)}/{args.cases} cases agree with the reference")
+        for failure in failures[:10]:
+            print(f"FAIL: {failure}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
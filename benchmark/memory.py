@@ -0,0 +1,108 @@
+"""
+Memory benchmark of parsing a single large feed.
+
+Generates feeds of several sizes with the mock feed generator (see
+`mock_server.py`) and runs `parse_feed` on each with both parser backends,
+each in a fresh interpreter. Reports the growth of the peak resident set
+while parsing, cleaning and filtering (which includes lxml's C
+allocations), the peak and retained Python heap (`tracemalloc`), and the
+time taken.
+
+Usage:
+    python benchmark/memory.py [--items 100 1000 5000] [--paragraphs 6] [--max-items 0]
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from mock_server import MockConfig, render_feed  # noqa: E402
+
+PARSERS = ["feedparser", "lxml"]
+
+RSS = {"name": "memory", "filters": [{"type": "exclude", "field": "title", "keywords": ["entry 1"]}]}
+
+
+def run_child(path: str, parser: str, max_items: int) -> None:
+    """Parse the feed at `path` in this process and print the figures as JSON."""
+    from src.parse import parse_feed
+
+    rss = dict(RSS, parser=parser, max_items=max_items)
+    # Import the parsers and compile the filters before measuring
+    parse_feed(render_feed(0, MockConfig(items=1)).encode("utf-8"), {}, rss, {})
+    with open(path, "rb") as f:
+        content = f.read()
+
+    # ru_maxrss is in kilobytes on Linux
+    gc.collect()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    result = parse_feed(content, {}, rss, {})
+    elapsed = time.perf_counter() - start
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    count = len(result.items)
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = parse_feed(content, {}, rss, {})
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps({"elapsed": elapsed, "rss_growth": rss_growth * 1024, "peak": peak,
+                      "retained": retained, "items": count}))
+
+
+def measure(items: int, paragraphs: int, atom: bool, parser: str, max_items: int) -> None:
+    """Parse one generated feed in a fresh interpreter and print its memory figures."""
+    config = MockConfig(items=items, paragraphs=paragraphs, atom_ratio=1.0 if atom else 0.0)
+    content = render_feed(1, config).encode("utf-8")
+    with tempfile.NamedTemporaryFile(suffix=".xml") as f:
+        f.write(content)
+        f.flush()
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", f.name,
+                                 "--parser", parser, "--max-items", str(max_items)],
+                                stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    mb = 1024 * 1024
+    print(f"{parser:>10} {'atom' if atom else 'rss':>4} {items:>6} entries, {len(content) / mb:6.1f} MB: "
+          f"peak RSS +{result['rss_growth'] / mb:6.1f} MB, heap peak {result['peak'] / mb:6.1f} MB, "
+          f"retained {result['retained'] / mb:6.1f} MB for {result['items']} items, "
+          f"{result['elapsed']:6.2f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the memory used to parse one feed")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="Entries per feed")
+    parser.add_argument("--paragraphs", type=int, default=6, help="Paragraphs per entry")
+    parser.add_argument("--parser", choices=PARSERS, nargs="+", default=PARSERS,
+                        help="Parser backends to measure")
+    parser.add_argument("--max-items", type=int, default=0, help="Stop after this many entries")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.parser[0], args.max_items)
+        return 0
+
+    for atom in (False, True):
+        for items in args.items:
+            for backend in args.parser:
+                measure(items, args.paragraphs, atom, backend, args.max_items)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Local mock endpoints for the benchmarks: synthetic RSS/Atom feeds and an
+OpenAI-compatible chat completions stub.
+
+    GET  /feed/{i}.xml            feed number i
+    POST /v1/chat/completions     summary of the prompt
+
+Feeds are generated deterministically from their number, so every run of
+a benchmark sees the same documents, and support `ETag` validators.
+
+Usage:
+    python benchmark/mock_server.py [--port 8765] [--items 20] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import web
+
+WORDS = ("feed summary article model token cache parser filter render network latency "
+         "python async server client stream budget window index digest").split()
+
+
+@dataclass
+class MockConfig:
+    """Shape of the synthetic workload."""
+    items: int = 20
+    paragraphs: int = 6
+    latency_ms: float = 50
+    jitter_ms: float = 20
+    fail_rate: float = 0.0
+    atom_ratio: float = 0.2
+    llm_latency_ms: float = 200
+    seed: int = 42
+
+
+def paragraph(rng: random.Random, words: int = 60) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def render_feed(number: int, config: MockConfig) -> str:
+    """Generate the document of feed `number`."""
+    rng = random.Random(config.seed * 100003 + number)
+    atom = rng.random() < config.atom_ratio
+    entries = []
+    for n in range(config.items):
+        body = "".join(f"<p>{paragraph(rng)}</p>" for _ in range(config.paragraphs))
+        html = f"<div><h2>Entry {n}</h2>{body}<script>track()</script></div>"
+        title = f"Feed {number} entry {n} {rng.choice(WORDS)}"
+        link = f"http://example.com/{number}/{n}"
+        if atom:
+            entries.append(f"<entry><id>{link}</id><title>{title}</title><link href=\"{link}\"/>"
+                           f"<updated>2024-01-01T00:00:00Z</updated>"
+                           f"<content type=\"html\"><![CDATA[{html}]]></content></entry>")
+        else:
+            entries.append(f"<item><guid>{link}</guid><title>{title}</title><link>{link}</link>"
+                           f"<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>"
+                           f"<description><![CDATA[{html}]]></description></item>")
+
+    if atom:
+        return ('<?xml version="1.0" encoding="utf-8"?>'
+                '<feed xmlns="http://www.w3.org/2005/Atom">'
+                f'<title>Mock feed {number}</title><link href="http://example.com/{number}"/>'
+                f'{"".join(entries)}</feed>')
+    return ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f'<title>Mock feed {number}</title><link>http://example.com/{number}</link>'
+            f'{"".join(entries)}</channel></rss>')
+
+
+class MockServer:
+    """The mock endpoints, served from a background thread."""
+
+    def __init__(self, config: MockConfig, port: int = 0):
+        """
+        Initialize the server.
+
+        Args:
+            config: Shape of the synthetic workload
+            port: Port to listen on, 0 for any free port
+        """
+        self.config = config
+        self.port = port
+        self.documents = {}
+        self.llm_calls = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.runner: Optional[web.AppRunner] = None
+        self.thread: Optional[threading.Thread] = None
+        self.ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def document(self, number: int):
+        if number not in self.documents:
+            body = render_feed(number, self.config).encode("utf-8")
+            self.documents[number] = (body, '"%s"' % hashlib.md5(body).hexdigest())
+        return self.documents[number]
+
+    async def delay(self, base_ms: float) -> None:
+        jitter = random.uniform(0, self.config.jitter_ms)
+        await asyncio.sleep((base_ms + jitter) / 1000)
+
+    async def feed(self, request: web.Request) -> web.Response:
+        number = int(request.match_info["number"])
+        await self.delay(self.config.latency_ms)
+        if random.Random(self.config.seed + number).random() < self.config.fail_rate:
+            raise web.HTTPInternalServerError()
+        body, etag = self.document(number)
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, headers={"ETag": etag},
+                            content_type="application/xml", charset="utf-8")
+
+    async def chat(self, request: web.Request) -> web.Response:
+        self.llm_calls += 1
+        payload = await request.json()
+        prompt = payload["messages"][-1]["content"]
+        await self.delay(self.config.llm_latency_ms)
+
+        summary = "关键词: mock<br><br>总结: " + " ".join(prompt.split()[:12])
+        if payload.get("response_format", {}).get("type") == "json_object":
+            ids = re.findall(r"Article \[([^\]]+)\]", prompt)
+            content = json.dumps({"summaries": [{"id": i, "summary": summary} for i in ids]},
+                                 ensure_ascii=False)
+        else:
+            content = summary
+
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return web.json_response({
+            "id": f"chatcmpl-{self.llm_calls}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": payload.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    async def serve(self) -> None:
+        app = web.Application()
+        app.router.add_get(r"/feed/{number:\d+}.xml", self.feed)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", self.port)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+        self.ready.set()
+
+    def start(self) -> "MockServer":
+        """Start serving in a background thread."""
+        def run() -> None:
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.serve())
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve mock feeds and a mock OpenAI endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--items", type=int, default=20, help="Entries per feed")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Feed response latency")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of feeds answering 500")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="Completion latency")
+    args = parser.parse_args()
+
+    server = MockServer(MockConfig(items=args.items, latency_ms=args.latency_ms,
+                                   fail_rate=args.fail_rate, llm_latency_ms=args.llm_latency_ms),
+                        port=args.port).start()
+    print(f"Serving on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
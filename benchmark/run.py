@@ -0,0 +1,286 @@
+"""
+Offline end-to-end benchmark of the pipeline.
+
+Starts the mock feed server and OpenAI stub (see `mock_server.py`),
+generates configs of 10, 100 and 1000 feeds and runs
+`RSSProcessorApp.run()` against each in a fresh process, twice: a cold run
+on empty state, then a warm run where feeds answer 304 and summaries are
+cached. A third, unforced run after adding a filter to every feed checks
+that feeds whose settings changed are refetched even though they are not
+due. Reports throughput, latency percentiles, per-stage time and peak
+RSS, stores the results under `benchmark/results/` and compares them with
+the previous results.
+
+Usage:
+    python benchmark/run.py [--feeds 10 100 1000] [--items 20] [--fail-on-regression]
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+BASE_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+sys.path.insert(0, BENCH_DIR)
+from mock_server import MockConfig, MockServer  # noqa: E402
+
+
+def build_config(count: int, base_url: str, llm_ratio: float) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate a feed config.
+
+    Every third feed filters on the title, every fifth excludes a long
+    keyword list from the article, and a `llm_ratio` share is summarized.
+    """
+    feeds = []
+    llm_every = int(1 / llm_ratio) if llm_ratio > 0 else 0
+    for i in range(count):
+        rss = {"name": f"bench{i}", "text": f"Bench feed {i}", "url": f"{base_url}/feed/{i}.xml",
+               "htmlUrl": f"http://example.com/{i}"}
+        filters = []
+        if i % 3 == 0:
+            filters.append({"type": "include", "field": "title",
+                            "keywords": ["cache", "parser", "model", "entry 1"]})
+        if i % 5 == 0:
+            filters.append({"type": "exclude", "field": "article",
+                            "keywords": [f"blocked{k}" for k in range(30)] + ["digest window budget"]})
+        if filters:
+            rss["filters"] = filters
+        if llm_every and i % llm_every == 0:
+            rss["use_chatgpt"] = True
+        feeds.append(rss)
+    return {"bench": feeds}
+
+
+def add_filter(config: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Add a title filter that changes no output to every feed of a config."""
+    for feeds in config.values():
+        for rss in feeds:
+            rss.setdefault("filters", []).append(
+                {"type": "exclude", "field": "title", "keywords": ["never in a title"]})
+
+
+def run_child(result_path: str, force: bool = True) -> None:
+    """Run the app in this process and record its run time and peak memory."""
+    os.chdir(BASE_DIR)
+    sys.path.insert(0, BASE_DIR)
+    import asyncio
+
+    import main
+
+    start = time.perf_counter()
+    # Poll every feed, so the warm run measures the 304 and cache path
+    # rather than skipping feeds that are not due yet
+    asyncio.run(main.main(force=force))
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux; parse workers are children
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    with open(result_path, "w") as f:
+        json.dump({"elapsed": elapsed, "peak_rss_mb": peak_kb / 1024}, f)
+
+
+def run_app(workdir: str, env: Dict[str, str], force: bool = True) -> Dict[str, Any]:
+    """Run the app against the benchmark workdir in a fresh interpreter."""
+    result_path = os.path.join(workdir, "child.json")
+    command = [sys.executable, os.path.abspath(__file__), "--child", result_path]
+    if not force:
+        command.append("--no-force")
+    with open(os.path.join(workdir, "output.log"), "a") as log:
+        subprocess.run(command, cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT, check=True)
+    with open(result_path) as f:
+        result = json.load(f)
+    with open(os.path.join(workdir, "log", "metrics.json")) as f:
+        result["metrics"] = json.load(f)
+    return result
+
+
+def fetched_feeds(run: Dict[str, Any]) -> int:
+    """Number of feeds a run requested from the mock server."""
+    return run["metrics"].get("stages", {}).get("fetch", {}).get("calls", 0)
+
+
+def summarize(count: int, phase: str, run: Dict[str, Any]) -> Dict[str, Any]:
+    """Condense a run into the figures that are stored and compared."""
+    report = run["metrics"]
+    counters = report.get("counters", {})
+    elapsed = run["elapsed"]
+    latency = report.get("latency", {})
+    return {
+        "feeds": count,
+        "phase": phase,
+        "elapsed": round(elapsed, 3),
+        "feeds_per_s": round(count / elapsed, 2),
+        "entries_per_s": round(counters.get("entries_in", 0) / elapsed, 2),
+        "peak_rss_mb": round(run["peak_rss_mb"], 1),
+        "feeds_failed": counters.get("feeds_failed", 0),
+        "llm_requests": counters.get("llm_requests", 0),
+        "cache_hit_ratio": report.get("cache_hit_ratio"),
+        "fetch_latency": latency.get("fetch_latency"),
+        "llm_latency": latency.get("llm_latency"),
+        "stages": {stage: values["seconds"] for stage, values in report.get("stages", {}).items()},
+    }
+
+
+def previous_results() -> Optional[Dict[str, Any]]:
+    """Load the most recent stored results."""
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = sorted(f for f in os.listdir(RESULTS_DIR) if f.endswith(".json"))
+    if not files:
+        return None
+    with open(os.path.join(RESULTS_DIR, files[-1])) as f:
+        return json.load(f)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              universal_newlines=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against local mocks")
+    parser.add_argument("--feeds", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Config sizes to run")
+    parser.add_argument("--items", type=int, default=20, help="Entries per feed")
+    parser.add_argument("--paragraphs", type=int, default=6, help="Paragraphs per entry")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Feed response latency")
+    parser.add_argument("--fail-rate", type=float, default=0.02, help="Share of feeds answering 500")
+    parser.add_argument("--llm-ratio", type=float, default=0.05, help="Share of feeds summarized")
+    parser.add_argument("--llm-latency-ms", type=float, default=100, help="Completion latency")
+    parser.add_argument("--parse-workers", type=int, default=0, help="PARSE_WORKERS of the app")
+    parser.add_argument("--parallel-workers", type=int, default=10, help="PARALLEL_WORKERS of the app")
+    parser.add_argument("--batch-size", type=int, default=1, help="SUMMARY_BATCH_SIZE of the app")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with 1 if any run regressed")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated workdirs")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--no-force", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, force=not args.no_force)
+        return 0
+
+    server = MockServer(MockConfig(items=args.items, paragraphs=args.paragraphs,
+                                   latency_ms=args.latency_ms, fail_rate=args.fail_rate,
+                                   llm_latency_ms=args.llm_latency_ms)).start()
+    print(f"Mock server on {server.base_url}")
+
+    results = []
+    try:
+        for count in args.feeds:
+            workdir = tempfile.mkdtemp(prefix=f"rss-bench-{count}-")
+            config_path = os.path.join(workdir, "config.yml")
+            config = build_config(count, server.base_url, args.llm_ratio)
+            with open(config_path, "w") as f:
+                yaml.safe_dump(config, f)
+
+            env = dict(os.environ)
+            env.update({
+                "RSS_CONFIG_PATH": config_path,
+                "RSS_DOCS_DIR": os.path.join(workdir, "docs"),
+                "RSS_DATA_DIR": os.path.join(workdir, "data"),
+                "RSS_LOG_DIR": os.path.join(workdir, "log"),
+                "OPENAI_API_KEY": "mock",
+                "OPENAI_BASE_URL": f"{server.base_url}/v1",
+                "OPENAI_MODEL": "deepseek-chat",
+                "OPENAI_RPM": "0",
+                "OPENAI_TPM": "0",
+                "OPENAI_RATE_LIMITS": "",
+                "PARSE_WORKERS": str(args.parse_workers),
+                "PARALLEL_WORKERS": str(args.parallel_workers),
+                "SUMMARY_BATCH_SIZE": str(args.batch_size),
+                "PROFILE": "0",
+            })
+            try:
+                for phase in ("cold", "warm"):
+                    run = run_app(workdir, env)
+                    if fetched_feeds(run) < count:
+                        print(f"FAIL: the {phase} run fetched only {fetched_feeds(run)} of {count} feeds")
+                        return 1
+                    result = summarize(count, phase, run)
+                    results.append(result)
+                    print(f"{count:>5} feeds {phase}: {result['elapsed']:.2f}s, "
+                          f"{result['feeds_per_s']} feeds/s, {result['entries_per_s']} entries/s, "
+                          f"peak RSS {result['peak_rss_mb']} MB")
+
+                # Feeds are not due right after the warm run, but changed
+                # settings must be applied anyway, without conditional requests
+                add_filter(config)
+                with open(config_path, "w") as f:
+                    yaml.safe_dump(config, f)
+                run = run_app(workdir, env, force=False)
+                not_modified = run["metrics"].get("counters", {}).get("feeds_not_modified", 0)
+                if fetched_feeds(run) < count or not_modified:
+                    print(f"FAIL: after a config change, {fetched_feeds(run)} of {count} feeds were "
+                          f"fetched and {not_modified:.0f} answered 304")
+                    return 1
+            finally:
+                if args.keep:
+                    print(f"  workdir kept: {workdir}")
+                else:
+                    shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        server.stop()
+
+    regressed = compare(results, previous_results(), args.threshold)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+        with open(path, "w") as f:
+            json.dump({"revision": git_revision(), "params": vars(args), "results": results},
+                      f, indent=2)
+        print(f"Results saved to: {path}")
+
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+def compare(results: List[Dict[str, Any]], previous: Optional[Dict[str, Any]],
+            threshold: float) -> bool:
+    """
+    Print the change of each run against the previous results.
+
+    Returns:
+        True if any run got slower by more than `threshold`
+    """
+    if not previous:
+        return False
+    before = {(r["feeds"], r["phase"]): r for r in previous.get("results", [])}
+    regressed = False
+    print(f"Compared with {previous.get('revision') or 'previous results'}:")
+    for result in results:
+        old = before.get((result["feeds"], result["phase"]))
+        if not old or not old["elapsed"]:
+            continue
+        change = result["elapsed"] / old["elapsed"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{result['feeds']:>5} feeds {result['phase']}: {old['elapsed']:.2f}s -> "
+              f"{result['elapsed']:.2f}s ({change:+.0%}), peak RSS {old['peak_rss_mb']} -> "
+              f"{result['peak_rss_mb']} MB{flag}")
+    return regressed
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Startup benchmark: measures how long `import main` takes with `python -X importtime`.
+
+Fails (exit code 1) when the median import time exceeds the budget, or when
+a module that should be imported lazily is loaded at startup.
+
+Usage:
+    python benchmark/startup.py [--runs 5] [--budget-ms 800] [--top 10]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Only needed for some runs, so they must not be imported by `import main`
+LAZY_MODULES = ["openai", "pandas", "openpyxl", "bs4", "feedparser", "opml", "tiktoken"]
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure() -> Tuple[int, Dict[str, int]]:
+    """
+    Import `main` in a fresh interpreter.
+
+    Returns:
+        Cumulative import time of `main` in microseconds, and the cumulative
+        time of every imported module
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=BASE_DIR, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                            universal_newlines=True, check=True)
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules.get("main", 0), modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure the import time of main.py")
+    parser.add_argument("--runs", type=int, default=5, help="Number of measurements")
+    parser.add_argument("--budget-ms", type=float, default=800, help="Maximum median import time")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to show")
+    args = parser.parse_args()
+
+    # The first run warms the bytecode cache
+    measure()
+    totals: List[int] = []
+    modules: Dict[str, int] = {}
+    for _ in range(args.runs):
+        total, modules = measure()
+        totals.append(total)
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"import main: median {median_ms:.1f} ms, min {min(totals) / 1000:.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("Slowest top-level modules (cumulative):")
+    top_level = {name: us for name, us in modules.items() if "." not in name and name != "main"}
+    for name, us in sorted(top_level.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: median import time {median_ms:.1f} ms is over the budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
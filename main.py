@@ -1,28 +1,53 @@
+import argparse
 import asyncio
+import cProfile
+import dataclasses
 import datetime
+import io
 import logging
+import multiprocessing
 import os
+import pstats
+import signal
 import time
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional, Tuple
-
-import feedparser
-import pandas as pd
-from dotenv import load_dotenv
-from jinja2 import Template
-from openai import OpenAI
-
-from root import (CACHE_PATH, CONFIG_PATH, COST_RECORD_PATH, DOCS_DIR,
-                  RSS_HTML_TEMPLATE_PATH, RSS_TEMPLATE_PATH, absolute)
-from src.AI.chatgpt import gpt_summary
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from root import (CACHE_PATH, CONFIG_PATH, COST_LEDGER_PATH, COST_RECORD_PATH,
+                  DEDUP_PATH, DOCS_DIR, FEED_STATUS_PATH, LEGACY_CACHE_PATH,
+                  METRICS_PATH, PROFILE_PATH, RSS_HTML_TEMPLATE_PATH,
+                  RSS_TEMPLATE_PATH, STATE_DIR, TEMPLATE_CACHE_DIR, absolute)
+from src.AI.scheduler import SummaryScheduler
+from src.AI.tokens import count_tokens, token_budget
 from src.cache import CacheKit
-from src.const import FilterField, FilterType, HtmlItem, Item
-from src.filter import filter_entry
-from src.util import (convert_yaml_to_opml, get_config, init_dirs, init_logger,
-                      md5hash_6)
+from src.const import HtmlItem, Item
+from src.dedup import DedupIndex, DedupMatch, canonical_url, simhash
+from src.fetch import FeedFetcher, FetchResult
+from src.health import CircuitBreaker, unhealthy_report
+from src.ledger import CostLedger
+from src.metrics import metrics
+from src.parse import ParsedFeed, filters_hash, get_feed_filter, parse_feed
+from src.render import TemplateRenderer
+from src.schedule import FeedScheduler, PollPolicy, feed_ttl, record_published
+from src.state import FeedStateStore
+from src.util import (convert_yaml_to_opml, get_config, get_env_int,
+                      init_dirs, init_logger, md5hash_6)
 
 logger = logging.getLogger()
-cache = CacheKit(CACHE_PATH)
+cache = CacheKit(
+    CACHE_PATH,
+    legacy_path=LEGACY_CACHE_PATH,
+    max_entries=get_env_int("CACHE_MAX_ENTRIES", 20000),
+    max_bytes=get_env_int("CACHE_MAX_BYTES", 0),
+    ttl=get_env_int("CACHE_TTL_DAYS", 90) * 86400,
+)
+dedup_index = DedupIndex(
+    DEDUP_PATH,
+    distance=get_env_int("DEDUP_DISTANCE", 4),
+    ttl=get_env_int("DEDUP_TTL_DAYS", 30) * 86400,
+)
+feed_state = FeedStateStore(STATE_DIR, status_path=FEED_STATUS_PATH)
+cost_ledger = CostLedger(COST_LEDGER_PATH, legacy_path=COST_RECORD_PATH)
 
 
 class RSSProcessorApp:
@@ -30,28 +55,39 @@ class RSSProcessorApp:
 
     def __init__(self):
         """Initialize the application."""
-        self.html_items: List[HtmlItem] = []
+        self.html_items: Dict[str, HtmlItem] = {}
         self.openai_client = None
         self.total_cost = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.item_feeds: Dict[str, str] = {}
         self.process_count = 0
         self.error_count = 0
+        self.unchanged_count = 0
+        self.skipped_count = 0
+        self.not_due_count = 0
+        self.changed_files = 0
         self.start_time = None
+        self.force = False
         self.default_model = "deepseek-chat"
         self.parallel_workers = 1
+        self.max_retries = 4
+        self.batch_size = 1
+        self.fetcher: Optional[FeedFetcher] = None
+        self.summarizer: Optional[SummaryScheduler] = None
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+        self.renderer: Optional[TemplateRenderer] = None
+        self.breaker = CircuitBreaker()
+        self.poll_policy = PollPolicy()
+        self.feed_health: Dict[str, Dict[str, Any]] = {}
+        self.dedup_enabled = False
+        self.drop_duplicates = False
+        self.dedup_summaries: Dict[int, asyncio.Future] = {}
 
     def init(self):
         """Initialize environment, logger, directories, and cache."""
-        load_dotenv()
-        
-        # Configure OpenAI API key
-        api_key = os.getenv("OPENAI_API_KEY")
-        base_url = os.getenv("OPENAI_BASE_URL")
-        if api_key:
-            if base_url:
-                self.openai_client = OpenAI(api_key=api_key, base_url=base_url)
-            else:
-                self.openai_client = OpenAI(api_key=api_key)
-        else:
+        # The environment is loaded from .env when `root` is imported
+        if not os.getenv("OPENAI_API_KEY"):
             logger.warning("OPENAI_API_KEY not found in environment variables.")
             
         # Set log level from environment
@@ -70,249 +106,764 @@ class RSSProcessorApp:
         except ValueError:
             self.parallel_workers = 5
         logger.info(f"Using {self.parallel_workers} parallel workers")
+        self.max_retries = get_env_int("OPENAI_MAX_RETRIES", self.max_retries)
+        self.batch_size = get_env_int("SUMMARY_BATCH_SIZE", self.batch_size)
+
+        # All feeds share one summary queue, so at most `parallel_workers`
+        # LLM requests are in flight at any time
+        self.summarizer = SummaryScheduler(
+            self.generate_summary,
+            concurrency=self.parallel_workers,
+            batch_size=self.batch_size,
+            batch_handler=self.generate_summaries,
+        )
+
+        # Configure the shared HTTP client used to download feeds
+        self.fetcher = FeedFetcher(
+            concurrency=get_env_int("FETCH_CONCURRENCY", 20),
+            per_host=get_env_int("FETCH_PER_HOST", 6),
+            timeout=get_env_int("FETCH_TIMEOUT", 30),
+        )
+
+        # Skip feeds that keep failing, with an exponentially growing cool-down
+        self.breaker = CircuitBreaker(
+            threshold=get_env_int("FEED_FAILURE_THRESHOLD", 3),
+            cooldown=get_env_int("FEED_COOLDOWN_HOURS", 6) * 3600,
+            max_cooldown=get_env_int("FEED_MAX_COOLDOWN_HOURS", 168) * 3600,
+        )
+
+        # Poll each feed about as often as it publishes
+        self.poll_policy = PollPolicy(
+            default=get_env_int("POLL_INTERVAL_MINUTES", 60) * 60,
+            minimum=get_env_int("POLL_MIN_MINUTES", 10) * 60,
+            maximum=get_env_int("POLL_MAX_MINUTES", 1440) * 60,
+        )
+
+        # Share one summary between copies of an article in several feeds,
+        # optionally dropping the copies from the output feeds
+        self.dedup_enabled = bool(get_env_int("DEDUP", 1))
+        self.drop_duplicates = bool(get_env_int("DEDUP_DROP", 0))
+
+        if self.parse_pool is not None:
+            logger.info(f"Parsing feeds with {get_env_int('PARSE_WORKERS', 0)} worker processes")
+
+        # Compile each template once, optionally reusing the bytecode of earlier runs
+        self.renderer = TemplateRenderer(
+            os.path.dirname(RSS_TEMPLATE_PATH),
+            bytecode_cache_dir=TEMPLATE_CACHE_DIR if get_env_int("TEMPLATE_BYTECODE_CACHE", 0) else None,
+        )
         
         init_logger()
         init_dirs()
         cache.load_cache()
+        if self.dedup_enabled:
+            dedup_index.load()
         self.start_time = time.time()
         
-    async def process_rss_feed(self, rss: Dict[str, Any]) -> None:
+    def get_openai_client(self) -> Optional[Any]:
+        """
+        Get the OpenAI client, creating it on first use.
+
+        The SDK is slow to import, so it is only loaded once a summary is requested.
+        
+        Returns:
+            The AsyncOpenAI client, or None if no API key is configured
+        """
+        api_key = os.getenv("OPENAI_API_KEY")
+        if self.openai_client is None and api_key:
+            from openai import AsyncOpenAI
+
+            # Retries are handled by the rate-limit aware request loop
+            base_url = os.getenv("OPENAI_BASE_URL")
+            if base_url:
+                self.openai_client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            else:
+                self.openai_client = AsyncOpenAI(api_key=api_key, max_retries=0)
+        return self.openai_client
+
+    async def process_rss_feed(self, rss: Dict[str, Any], force: bool = False) -> Optional[Dict[str, Any]]:
         """
         Process a single RSS feed.
         
         Args:
             rss: RSS feed configuration
+            force: Poll the feed even if it is not due yet
+
+        Returns:
+            The updated state of the feed, or None if processing raised an error
         """
         try:
             logger.info(f"Processing: {rss.get('text', 'Unknown feed')}")
+            state = feed_state.load(rss["name"])
+            health = self.feed_health[rss["name"]] = state.setdefault("health", {})
+
+            # Skip feeds whose circuit is open, keeping their last XML
+            if not self.breaker.allow(health):
+                retry_at = datetime.datetime.fromtimestamp(health["open_until"]).strftime("%Y-%m-%d %H:%M")
+                logger.warning(f"Skipping failing feed ({health.get('failures')} failures in a row, "
+                               f"next try after {retry_at}): {rss.get('text', 'Unknown feed')}")
+                metrics.count("feeds_skipped")
+                self.skipped_count += 1
+                if os.path.exists(absolute(DOCS_DIR, rss["name"] + ".xml")):
+                    self.add_rss_to_html_items(rss)
+                return state
+
+            # Skip feeds that are not due yet, keeping their last XML, unless
+            # it was rendered with other settings or the feed is new
+            if not (self.force or force) and os.path.exists(absolute(DOCS_DIR, rss["name"] + ".xml")) \
+                    and not self.settings_changed(rss, state) \
+                    and not self.poll_policy.is_due(state):
+                next_poll = datetime.datetime.fromtimestamp(state["next_poll"]).strftime("%Y-%m-%d %H:%M")
+                logger.info(f"Feed not due until {next_poll}: {rss.get('text', 'Unknown feed')}")
+                metrics.count("feeds_not_due")
+                self.not_due_count += 1
+                self.add_rss_to_html_items(rss)
+                return state
+
+            entries = self.seen_entries(rss, state)
             
-            # Step 1: Fetch feed data
-            feed = self.get_feeds(rss)
+            # Step 1: Fetch feed data, then parse and filter entries that are
+            # new or changed since the last run
+            feed = await self.get_feeds(rss, state, entries)
             if not feed:
                 logger.error(f"Failed to fetch feed: {rss.get('text', 'Unknown feed')}")
                 self.error_count += 1
-                return
+                self.save_state(rss, state)
+                return state
+
+            # Keep the existing XML when the server reports no changes
+            if feed.status == 304:
+                logger.info(f"Feed not modified: {rss.get('text', 'Unknown feed')}")
+                if os.path.exists(absolute(DOCS_DIR, rss["name"] + ".xml")):
+                    self.add_rss_to_html_items(rss)
+                self.unchanged_count += 1
+                self.save_state(rss, state)
+                return state
                 
-            # Step 2: Filter entries
-            filtered_items = self.filter_entries(rss, feed)
-            if not filtered_items:
-                logger.info(f"No entries passed filtering: {rss.get('text', 'Unknown feed')}")
-                return
+            # Remember how often the feed asks to be polled and when its
+            # entries were published, to decide when to poll it next
+            ttl = feed_ttl(feed.feed)
+            if ttl:
+                state["ttl"] = ttl
+            else:
+                state.pop("ttl", None)
+            record_published(state, feed.published)
+
+            # Take the items over, so the feed only keeps its channel metadata
+            new_items, feed.items = feed.items, []
+            index = self.build_index(feed, entries)
+
+            # Resolve copies of articles already seen in other feeds
+            matches: Dict[str, DedupMatch] = {}
+            if self.dedup_enabled and new_items:
+                with metrics.timer("dedup", rss["name"]):
+                    new_items, matches = self.deduplicate(rss, new_items)
                 
             # Step 3: Generate AI summaries if enabled
-            if rss.get("use_chatgpt", False):
-                await self.process_ai_summaries(filtered_items)
+            if rss.get("use_chatgpt", False) and new_items:
+                with metrics.timer("summarize", rss["name"]):
+                    new_items = await self.process_ai_summaries(rss, new_items, matches)
+
+            # Merge the new items with the ones processed in earlier runs
+            filtered_items = self.merge_entries(rss, index, new_items)
+            del new_items
+            state["filters_hash"] = filters_hash(rss)
+            state["use_chatgpt"] = bool(rss.get("use_chatgpt", False))
+            state["entries"] = index
+            if not filtered_items:
+                logger.info(f"No entries passed filtering: {rss.get('text', 'Unknown feed')}")
+                self.update_validators(rss, state, feed)
+                self.save_state(rss, state)
+                return state
                 
-            # Step 4: Render and save XML
-            rss_xml = self.render_xml(feed, filtered_items)
-            self.output_xml(rss, rss_xml)
+            # Step 4: Render XML to file
+            metrics.count("entries_out", len(filtered_items), rss["name"])
+            with metrics.timer("render", rss["name"]):
+                self.output_xml(rss, feed, filtered_items, state)
             
             # Step 5: Add to HTML items for index
             self.add_rss_to_html_items(rss)
+
+            # Step 6: Remember the HTTP validators for the next conditional request
+            self.update_validators(rss, state, feed)
+            with metrics.timer("state", rss["name"]):
+                self.save_state(rss, state)
             
             self.process_count += 1
             logger.info(f"Completed processing: {rss.get('text', 'Unknown feed')}")
+            return state
             
         except Exception as e:
             logger.error(f"Error processing feed {rss.get('text', 'Unknown')}: {str(e)}", exc_info=True)
             self.error_count += 1
+            return None
+
+    def save_state(self, rss: Dict[str, Any], state: Dict[str, Any]) -> None:
+        """
+        Schedule the next poll of a feed that was just polled, then save its state.
+        
+        Args:
+            rss: RSS feed configuration
+            state: Stored state of the feed
+        """
+        self.poll_policy.schedule(rss, state)
+        feed_state.save(rss["name"], state)
 
-    def get_feeds(self, rss: Dict[str, Any]) -> Optional[Any]:
+    async def get_feeds(self, rss: Dict[str, Any], state: Dict[str, Any],
+                        seen: Dict[str, Any]) -> Optional[ParsedFeed]:
         """
-        Fetch RSS feed data.
+        Fetch RSS feed data over the shared HTTP client and parse it.
+
+        The request is conditional on the validators stored in `state`, as long
+        as the previously rendered XML still exists, or none was rendered
+        because no entry passed the filters, and the current filters and
+        summary setting were used. A `304 Not Modified`
+        response yields an empty feed with `status` 304, like feedparser does.
         
         Args:
             rss: RSS feed configuration
+            state: Stored state of the feed
+            seen: Index of entries processed in earlier runs
             
         Returns:
             Parsed feed data or None if fetching fails
         """
+        health = state.setdefault("health", {})
         try:
-            feed = feedparser.parse(rss["url"])
+            headers = {}
+            # Feeds none of whose entries passed the filters have no XML to keep
+            rendered = os.path.exists(absolute(DOCS_DIR, rss["name"] + ".xml")) \
+                or not any(record.get("item") for record in state.get("entries", {}).values())
+            if rendered and not self.settings_changed(rss, state):
+                if state.get("etag"):
+                    headers["If-None-Match"] = state["etag"]
+                if state.get("last_modified"):
+                    headers["If-Modified-Since"] = state["last_modified"]
+
+            with metrics.timer("fetch", rss["name"]):
+                result = await self.fetcher.fetch(rss["url"], headers=headers)
+            metrics.count("bytes_fetched", len(result.content), rss["name"])
+            metrics.observe("fetch_latency", result.elapsed)
+            if result.status == 304:
+                self.breaker.record_success(health, result.elapsed)
+                return ParsedFeed(status=304, headers=result.headers)
+
+            feed = await self.parse(rss, result, seen)
+            feed.status = result.status
             
-            if feed.bozo and feed.get("bozo_exception"):
-                error = feed.get("bozo_exception", "")
-                logger.error(f"Feed parse error: {error}")
+            if feed.error:
+                logger.error(f"Feed parse error: {feed.error}")
+                self.breaker.record_failure(health, f"Parse error: {feed.error}")
                 return None
+
+            self.breaker.record_success(health, result.elapsed)
                 
             if not feed.entries:
                 logger.warning(f"Feed has no entries: {rss.get('text', 'Unknown feed')}")
-                
+
+            for stage, seconds in feed.timings.items():
+                metrics.add_time(stage, seconds, rss["name"])
+            new_entries = sum(1 for _, _, unchanged in feed.entries if not unchanged)
+            metrics.count("entries_in", len(feed.entries), rss["name"])
+            metrics.count("entries_new", new_entries, rss["name"])
+            metrics.count("entries_passed", len(feed.items), rss["name"])
+            logger.info(f"Filtered {len(feed.items)}/{new_entries} new entries "
+                        f"({len(feed.entries) - new_entries} unchanged)")
             return feed
             
         except Exception as e:
             logger.error(f"Feed fetch error: {str(e)}", exc_info=True)
+            self.breaker.record_failure(health, str(e) or type(e).__name__)
             return None
 
-    def filter_entries(self, rss: Dict[str, Any], feed: Any) -> List[Item]:
+    async def parse(self, rss: Dict[str, Any], result: FetchResult,
+                    seen: Dict[str, Any]) -> ParsedFeed:
         """
-        Filter feed entries based on configured filters.
+        Parse and filter a downloaded feed, in the process pool if there is one.
+
+        Only the content hashes of reusable entries are sent to the worker,
+        not the stored items.
         
         Args:
             rss: RSS feed configuration
-            feed: Parsed feed data
+            result: Raw feed download
+            seen: Index of entries processed in earlier runs
             
         Returns:
-            List of filtered feed items
+            Parsed feed data
         """
-        filtered_items = []
-        total_entries = len(feed.entries)
+        reusable = {id_: record["hash"] for id_, record in seen.items()
+                    if self.is_reusable(rss, record)}
+        if self.parse_pool is None:
+            return parse_feed(result.content, result.headers, rss, reusable)
+
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.parse_pool, parse_feed,
+                                          result.content, result.headers, rss, reusable)
+
+    def update_validators(self, rss: Dict[str, Any], state: Dict[str, Any], feed: ParsedFeed) -> None:
+        """
+        Store the `ETag`/`Last-Modified` validators of a fetched feed.
+
+        Failed summaries are retried when their entries are parsed again,
+        which a `304 Not Modified` response would prevent, so no validators
+        are stored while any summary is missing.
         
-        for item in feed.entries:
-            try:
-                # Extract ID or generate one if missing
-                id_ = item.get("id", item.get(
-                    "link", md5hash_6(item.get("title", "No Title"))))
-                    
-                # Get article content if available
-                article = ""
-                if not item.get("media_content", ""):
-                    article = item.get("summary", "") or item.get(
-                        "description", "") or ""
-                
-                # Create item data structure
-                data = {
-                    "id": id_,
-                    "guid": id_,
-                    "link": item.get("link", ""),
-                    "title": item.get("title", "No Title"),
-                    "updated": item.get("updated", ""),
-                    "article": article,
-                    "media_thumbnail": item.get("media_thumbnail"),
-                    "media_content": item.get("media_content"),
-                    "summary": ""
-                }
-                
-                # Create Item object and apply filters
-                entry_item = Item(**data)
-                should_include = True
-                
-                for item_filter in rss.get("filters", []):
-                    filter_type = FilterType.from_str(item_filter["type"])
-                    filter_field = FilterField.from_str(item_filter["field"])
-                    keywords = item_filter["keywords"]
-                    
-                    if not filter_entry(entry_item, filter_type, filter_field, keywords):
-                        should_include = False
-                        break
-                        
-                if should_include:
-                    filtered_items.append(entry_item)
-                    
-            except Exception as e:
-                logger.warning(f"Error processing entry: {str(e)}")
-                
-        logger.info(f"Filtered {len(filtered_items)}/{total_entries} entries")
-        return filtered_items
+        Args:
+            rss: RSS feed configuration
+            state: Stored state of the feed, updated in place
+            feed: Parsed feed data
+        """
+        if any(not self.is_reusable(rss, record) for record in state.get("entries", {}).values()):
+            logger.info(f"Not storing validators until all summaries are done: {rss.get('text', 'Unknown feed')}")
+            state["etag"] = state["last_modified"] = ""
+            return
+        headers = feed.headers
+        state["etag"] = headers.get("etag", "")
+        state["last_modified"] = headers.get("last-modified", "")
+
+    def settings_changed(self, rss: Dict[str, Any], state: Dict[str, Any]) -> bool:
+        """
+        Check whether the XML of a feed was rendered with different settings.
 
-    async def process_ai_summaries(self, filtered_items: List[Item]) -> None:
+        Args:
+            rss: RSS feed configuration
+            state: Stored state of the feed
+
+        Returns:
+            True if the filters or the summary setting changed since the last run
         """
-        Process AI summaries for items using async processing.
+        return state.get("filters_hash") != filters_hash(rss) \
+            or state.get("use_chatgpt") != bool(rss.get("use_chatgpt", False))
+
+    def seen_entries(self, rss: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the index of entries processed in earlier runs.
+
+        The index is discarded when the filter configuration changed, because
+        the stored filter decisions no longer apply.
         
         Args:
-            filtered_items: List of filtered items to summarize
+            rss: RSS feed configuration
+            state: Stored state of the feed
+            
+        Returns:
+            Mapping of entry id to its content hash and processed item
         """
-        # Use configured number of parallel workers
-        batch_size = self.parallel_workers
+        if state.get("filters_hash") != filters_hash(rss):
+            return {}
+        return state.get("entries", {})
+
+    def is_reusable(self, rss: Dict[str, Any], record: Dict[str, Any]) -> bool:
+        """
+        Check whether a stored entry can be reused as is if its content is unchanged.
         
-        # Process items in batches using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=batch_size) as executor:
-            loop = asyncio.get_event_loop()
-            tasks = []
+        Args:
+            rss: RSS feed configuration
+            record: Stored index record of the entry
             
-            for item in filtered_items:
-                # Process if article has sufficient content
-                if len(item.article) >= 400:
-                    task = loop.run_in_executor(
-                        executor, 
-                        self.generate_summary,
-                        item
-                    )
-                    tasks.append(task)
+        Returns:
+            True if the entry needs no further work
+        """
+        item = record.get("item")
+        # Retry summaries that failed in an earlier run
+        if item and rss.get("use_chatgpt", False) and not item.get("summary"):
+            return record.get("length", len(item.get("article", ""))) < 400
+        return True
+
+    def build_index(self, feed: ParsedFeed, seen: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the entry index of the current feed, in feed order.
+
+        When parsing stopped at an entry processed in an earlier run, the
+        entries stored after it are assumed to still be in the feed and are
+        kept, up to the size of the stored index.
+        
+        Args:
+            feed: Parsed feed data
+            seen: Index of entries processed in earlier runs
             
-            # Wait for all tasks to complete
-            if tasks:
-                await asyncio.gather(*tasks)
+        Returns:
+            Mapping of entry id to its content hash and processed item
+        """
+        index: Dict[str, Any] = {}
+        for id_, hash_, unchanged in feed.entries:
+            index[id_] = seen[id_] if unchanged else {"hash": hash_, "item": None}
+
+        if feed.stopped_at in seen:
+            ids = list(seen)
+            for id_ in ids[ids.index(feed.stopped_at) + 1:]:
+                if len(index) >= len(seen):
+                    break
+                index.setdefault(id_, seen[id_])
+        return index
+
+    def merge_entries(self, rss: Dict[str, Any], index: Dict[str, Any],
+                      new_items: List[Item]) -> List[Item]:
+        """
+        Merge newly processed items with the stored ones, in feed order.
+        
+        Args:
+            rss: RSS feed configuration
+            index: Entry index of the current feed, updated in place
+            new_items: Newly processed items that passed filtering
+            
+        Returns:
+            List of all filtered feed items
+        """
+        new = {item.id: item for item in new_items}
+        for item in new_items:
+            index[item.id]["item"] = dataclasses.asdict(item)
+            # Only summarized feeds need the text length, see `is_reusable`
+            if rss.get("use_chatgpt", False):
+                index[item.id]["length"] = len(item.cleaned)
+        return [new.get(id_) or Item(**record["item"])
+                for id_, record in index.items() if record.get("item")]
+
+    def compile_filters(self, rss_cfg: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        Compile the filters of every feed once, when the config is loaded.
+
+        Parse worker processes compile the filters they use on first use.
+        
+        Args:
+            rss_cfg: Feed groups from the config
+        """
+        for group_items in rss_cfg.values():
+            for rss in group_items:
+                try:
+                    get_feed_filter(rss)
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.error(f"Invalid filters for {rss.get('text', 'Unknown feed')}: {str(e)}")
+
+    def deduplicate(self, rss: Dict[str, Any],
+                    items: List[Item]) -> Tuple[List[Item], Dict[str, DedupMatch]]:
+        """
+        Resolve new items to their canonical articles in the cross-feed index.
+
+        Items are matched by canonical link, and those whose text is cleaned
+        anyway by content fingerprint too. Copies of articles first seen in
+        another feed are dropped if the feed sets `drop_duplicates`, which
+        defaults to DEDUP_DROP.
+        
+        Args:
+            rss: RSS feed configuration
+            items: Newly processed items that passed filtering
+
+        Returns:
+            The items to keep, and the canonical article of every item by ID
+        """
+        drop = rss.get("drop_duplicates", self.drop_duplicates)
+        fingerprint = rss.get("use_chatgpt", False) or drop
+        kept = []
+        matches: Dict[str, DedupMatch] = {}
+        for item in items:
+            match = dedup_index.resolve(rss["name"], item.id, canonical_url(item.link),
+                                        simhash(item.cleaned) if fingerprint else None)
+            matches[item.id] = match
+            if match.duplicate:
+                metrics.count("duplicates", feed=rss["name"])
+                if drop:
+                    logger.info(f"Dropping duplicate of an entry of {match.feed}: {item.title}")
+                    metrics.count("duplicates_dropped", feed=rss["name"])
+                    continue
+            kept.append(item)
+        return kept, matches
+
+    async def process_ai_summaries(self, rss: Dict[str, Any], filtered_items: List[Item],
+                                   matches: Optional[Dict[str, DedupMatch]] = None) -> List[Item]:
+        """
+        Process AI summaries for items through the shared summary scheduler.
+
+        Copies of an article first seen in another feed reuse its summary,
+        waiting for it if that feed is summarizing the article right now.
+        
+        Args:
+            rss: RSS feed configuration
+            filtered_items: List of filtered items to summarize
+            matches: Canonical article of each item by ID, see `deduplicate`
+
+        Returns:
+            The items, with summaries where one was generated
+        """
+        matches = matches or {}
+        summaries: Dict[str, str] = {}
+        pending = []
+        waiting: List[Tuple[Item, asyncio.Future]] = []
+        # Process if article has sufficient content
+        for item in filtered_items:
+            if len(item.cleaned) < 400:
+                continue
+            match = matches.get(item.id)
+            if match and match.duplicate and match.summary and match.model == self.default_model:
+                logger.info(f"Reusing summary of duplicate from {match.feed}: {item.title}")
+                metrics.count("dedup_hits", feed=rss["name"])
+                summaries[item.id] = match.summary
+            elif match and match.duplicate and match.article_id in self.dedup_summaries:
+                waiting.append((item, self.dedup_summaries[match.article_id]))
+            else:
+                pending.append(item)
+        summaries.update(await self.summarize_articles(rss, pending, matches))
+
+        # Summarize the copies whose canonical article got no summary
+        retry = []
+        for item, future in waiting:
+            summary = await asyncio.shield(future)
+            if summary:
+                logger.info(f"Reusing summary of duplicate: {item.title}")
+                metrics.count("dedup_hits", feed=rss["name"])
+                summaries[item.id] = summary
+            else:
+                retry.append(item)
+        summaries.update(await self.summarize_articles(rss, retry, matches))
+        return [item.replace(summary=summaries[item.id]) if item.id in summaries else item
+                for item in filtered_items]
+
+    async def summarize_articles(self, rss: Dict[str, Any], items: List[Item],
+                                 matches: Dict[str, DedupMatch]) -> Dict[str, str]:
+        """
+        Summarize items, sharing each summary with the copies of its article.
+
+        Until the summaries are done, other feeds wait for them instead of
+        summarizing copies of the same articles; afterwards they are stored
+        in the dedup index for later copies.
+        
+        Args:
+            rss: RSS feed configuration
+            items: Items to summarize
+            matches: Canonical article of each item by ID
+
+        Returns:
+            Summary of each item by ID, for the items that got one
+        """
+        if not items:
+            return {}
+        loop = asyncio.get_running_loop()
+        owned: Dict[int, asyncio.Future] = {}
+        for item in items:
+            self.item_feeds[item.id] = rss["name"]
+            match = matches.get(item.id)
+            if match and match.article_id not in self.dedup_summaries:
+                owned[match.article_id] = self.dedup_summaries[match.article_id] = loop.create_future()
+
+        summaries: Dict[str, str] = {}
+        shared: Dict[int, str] = {}
+        try:
+            for item, summary in zip(items, await self.summarizer.summarize(items)):
+                if not summary:
+                    continue
+                summaries[item.id] = summary
+                match = matches.get(item.id)
+                if match:
+                    shared[match.article_id] = summary
+                    dedup_index.set_summary(match.article_id, self.default_model, summary)
+        finally:
+            for article_id, future in owned.items():
+                del self.dedup_summaries[article_id]
+                future.set_result(shared.get(article_id, ""))
+        return summaries
 
-    def generate_summary(self, item: Item) -> None:
+    async def generate_summary(self, item: Item) -> str:
         """
         Generate summary for a single item.
         
         Args:
             item: The item to generate a summary for
+
+        Returns:
+            The summary, or an empty string if none was generated
+        """
+        return (await self.generate_summaries([item]))[0]
+
+    async def generate_summaries(self, items: List[Item]) -> List[str]:
         """
-        key = md5hash_6(item.id)
+        Generate summaries for several items.
+
+        Items without a cached summary that are short enough are packed into
+        one batched request; the others, and any the batch failed to
+        summarize, fall back to one request each.
         
-        # Use cached summary if available
-        if cache.has(key):
-            logger.info(f"Cache hit for: {item.title}")
-            item.summary = cache.get(key)
-            return
+        Args:
+            items: The items to generate summaries for
+
+        Returns:
+            The summary of each item, empty if none was generated
+        """
+        from src.AI.chatgpt import summary_cache_key
+
+        model = self.default_model  # Use configured model
+        summaries: Dict[str, str] = {}
+        keys = []
+        pending: List[Tuple[Item, str, str]] = []
+        for item in items:
+            text = item.cleaned
+            key = summary_cache_key(item.id, text, model)
+            keys.append(key)
+        
+            # Use cached summary if available
+            summary = self.get_cached_summary(item, key)
+            feed = self.item_feeds.get(item.id)
+            if summary:
+                logger.info(f"Cache hit for: {item.title}")
+                metrics.count("cache_hits", feed=feed)
+                summaries[key] = summary
+            elif len(text) >= 400:
+                metrics.count("cache_misses", feed=feed)
+                pending.append((item, text, key))
+
+        if len(pending) > 1:
+            max_tokens = token_budget(model) // len(pending)
+            batch = [p for p in pending if count_tokens(p[1], model) <= max_tokens]
+            if len(batch) > 1:
+                for (_, _, key), summary in zip(batch, await self.request_batch_summary(batch)):
+                    if summary:
+                        summaries[key] = summary
+                pending = [p for p in pending if p[2] not in summaries]
+
+        for item, text, key in pending:
+            summaries[key] = await self.request_summary(item, text, key)
+        return [summaries.get(key, "") for key in keys]
+
+    async def request_batch_summary(self, batch: List[Tuple[Item, str, str]]) -> List[str]:
+        """
+        Summarize several items with one batched request.
+        
+        Args:
+            batch: Items with their cleaned text and cache key
+
+        Returns:
+            The summary of each item, empty where the batch returned none
+        """
+        from src.AI.chatgpt import gpt_summary_batch_async
+
+        logger.info(f"Generating batched summaries for {len(batch)} items")
+        articles = {str(i): text for i, (_, text, _) in enumerate(batch, 1)}
+        response = await gpt_summary_batch_async(articles, self.default_model,
+                                                 client=self.get_openai_client(),
+                                                 max_retries=self.max_retries)
+        self.record_usage([item for item, _, _ in batch], response)
+
+        summaries = response.get("summaries", {})
+        for i, (_, _, key) in enumerate(batch, 1):
+            summary = summaries.get(str(i), "")
+            if summary:
+                cache.set(key, summary)
+        logger.info(f"Batched summaries generated for {len(summaries)}/{len(batch)} items")
+        return [summaries.get(str(i), "") for i in range(1, len(batch) + 1)]
+
+    async def request_summary(self, item: Item, text: str, key: str) -> str:
+        """
+        Summarize a single item with its own request.
+        
+        Args:
+            item: The item to summarize
+            text: Cleaned article text
+            key: Cache key of the summary
+
+        Returns:
+            The summary, or an empty string if none was generated
+        """
+        from src.AI.chatgpt import gpt_summary_async
+
+        model = self.default_model  # Use configured model
             
         # Generate new summary
         try:
             logger.info(f"Generating summary for: {item.title}")
-            model = self.default_model  # Use configured model
             
-            response = gpt_summary(item.article, model, client=self.openai_client)
+            response = await gpt_summary_async(text, model, client=self.get_openai_client(),
+                                               max_retries=self.max_retries)
             summary = response.get("summary", "")
-            cost = response.get("price", 0)
+            self.record_usage([item], response)
             
             if summary:
                 cache.set(key, summary)
-                item.summary = summary
-                self.total_cost += cost
                 logger.info(f"Summary generated ({len(summary)} chars)")
             else:
                 logger.warning(f"Empty summary generated for: {item.title}")
+            return summary
                 
         except Exception as e:
             logger.error(f"AI summary error: {str(e)}", exc_info=True)
+            return ""
 
-    def render_xml(self, feed: Any, filtered_items: List[Item]) -> str:
+    def record_usage(self, items: List[Item], response: Dict[str, Any]) -> None:
         """
-        Render XML from feed and filtered items.
+        Add the usage of a summary request to the run totals and the cost ledger.
         
         Args:
-            feed: Parsed feed data
-            filtered_items: List of filtered items
+            items: The items summarized by the request
+            response: Response of the request
+        """
+        if not response.get("tokens"):
+            return
+        price = response.get("price", 0)
+        self.total_cost += price
+        self.prompt_tokens += response.get("prompt_tokens", 0)
+        self.completion_tokens += response.get("completion_tokens", 0)
+        feeds = sorted({self.item_feeds.get(item.id, "") for item in items})
+        feed = feeds[0] if len(feeds) == 1 else None
+        metrics.count("prompt_tokens", response.get("prompt_tokens", 0), feed)
+        metrics.count("completion_tokens", response.get("completion_tokens", 0), feed)
+        metrics.count("cost", price, feed)
+        cost_ledger.record("request", ",".join(feeds), self.default_model,
+                           response.get("prompt_tokens", 0), response.get("completion_tokens", 0), price)
+
+    def get_cached_summary(self, item: Item, key: str) -> str:
+        """
+        Look up a cached summary, migrating it from the legacy key if needed.
+
+        Summaries cached before the versioned key scheme are stored under the
+        6-character `md5hash_6(item.id)`. The first run after the upgrade
+        moves them to the new key, so the back catalog does not have to be
+        summarized again; later runs never fall back to the legacy key.
+        
+        Args:
+            item: The item to look up
+            key: Versioned cache key of the item
             
         Returns:
-            Rendered XML string
+            The cached summary or empty string if not found
         """
-        try:
-            with open(RSS_TEMPLATE_PATH, "r", encoding="utf-8") as f:
-                template = Template(f.read())
-                
-            rss_xml = template.render(feed=feed.feed, items=filtered_items)
-            logger.info(f"XML rendering complete ({len(rss_xml)} chars)")
-            return rss_xml
-            
-        except Exception as e:
-            logger.error(f"XML rendering error: {str(e)}", exc_info=True)
-            return ""
+        summary = cache.get(key)
+        if summary:
+            return summary
+
+        legacy_key = md5hash_6(item.id)
+        summary = cache.claim_legacy(legacy_key)
+        if summary:
+            logger.debug(f"Migrating legacy cache key {legacy_key} -> {key}")
+            cache.set(key, summary)
+        return summary
 
-    def output_xml(self, rss: Dict[str, Any], data: str) -> None:
+    def output_xml(self, rss: Dict[str, Any], feed: ParsedFeed, filtered_items: List[Item],
+                   state: Dict[str, Any]) -> None:
         """
-        Output XML to file.
+        Render XML from feed and filtered items, streaming it to file.
+
+        The file is only rewritten when its content changed since the last run.
         
         Args:
             rss: RSS feed configuration
-            data: XML data to write
+            feed: Parsed feed data
+            filtered_items: List of filtered items
+            state: Stored state of the feed, holding the digest of the last output
         """
-        if not data:
-            return
-            
         try:
             if not os.path.exists(DOCS_DIR):
                 os.makedirs(DOCS_DIR)
             logger.info(rss)
             rss_xml_filename = absolute(DOCS_DIR, rss["name"] + ".xml")
             
-            with open(rss_xml_filename, "w", encoding="utf-8") as f:
-                f.write(data)
-                
-            logger.info(f"XML saved to: {rss_xml_filename}")
+            digest, changed = self.renderer.render_to_file(
+                os.path.basename(RSS_TEMPLATE_PATH), rss_xml_filename, state.get("digest", ""),
+                feed=feed.feed, items=filtered_items)
+            state["digest"] = digest
+            if changed:
+                self.changed_files += 1
+                logger.info(f"XML saved to: {rss_xml_filename}")
+            else:
+                logger.info(f"XML unchanged: {rss_xml_filename}")
             
         except Exception as e:
             logger.error(f"Error saving XML: {str(e)}", exc_info=True)
@@ -320,17 +871,15 @@ class RSSProcessorApp:
     def render_html(self) -> None:
         """Render HTML index page from collected HTML items."""
         try:
-            with open(RSS_HTML_TEMPLATE_PATH, "r", encoding="utf-8") as f:
-                html_template = Template(f.read())
-                
             current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            html = html_template.render(
-                items=self.html_items, 
+            _, changed = self.renderer.render_to_file(
+                os.path.basename(RSS_HTML_TEMPLATE_PATH),
+                absolute(DOCS_DIR, "index.html"),
+                items=list(self.html_items.values()), 
                 updatetime=current_time
             )
-            
-            with open(absolute(DOCS_DIR, "index.html"), "w", encoding="utf-8") as f:
-                f.write(html)
+            if changed:
+                self.changed_files += 1
                 
             logger.info(f"HTML index saved with {len(self.html_items)} feeds")
             
@@ -349,7 +898,7 @@ class RSSProcessorApp:
         name = rss.get("name", "") + "_" + formatted_date + ".xml"
         new_url = rss.get("name", "") + ".xml"
         
-        self.html_items.append(HtmlItem(rss.get("url"), new_url, name))
+        self.html_items[rss.get("name", "")] = HtmlItem(rss.get("url"), new_url, name)
 
     def output_opml(self) -> None:
         """Output OPML file of all feeds."""
@@ -360,30 +909,14 @@ class RSSProcessorApp:
             logger.error(f"Error generating OPML: {str(e)}", exc_info=True)
 
     def record_cost(self) -> None:
-        """Record AI usage cost to Excel file."""
-        if not self.total_cost:
+        """Record the AI usage of this run in the cost ledger."""
+        if not self.prompt_tokens and not self.completion_tokens:
             return
             
-        try:
-            logger.info(f"Total AI cost: {self.total_cost:.8f}")
-            
-            # Read existing cost record or create new one
-            if not os.path.exists(COST_RECORD_PATH):
-                df = pd.DataFrame(columns=["time", "cost"])
-            else:
-                df = pd.read_excel(COST_RECORD_PATH)
-
-            # Add new cost record
-            timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            new_record = pd.DataFrame([[timestamp, self.total_cost]], columns=["time", "cost"])
-            df = pd.concat([df, new_record], ignore_index=True)
-            
-            # Save to Excel
-            df.to_excel(COST_RECORD_PATH, index=False)
-            logger.info(f"Cost record saved to: {COST_RECORD_PATH}")
-            
-        except Exception as e:
-            logger.error(f"Error recording cost: {str(e)}", exc_info=True)
+        logger.info(f"Total AI cost: {self.total_cost:.8f}")
+        cost_ledger.record("run", "", self.default_model, self.prompt_tokens,
+                           self.completion_tokens, self.total_cost)
+        logger.info(f"Cost record saved to: {COST_LEDGER_PATH}")
 
     def log_stats(self) -> None:
         """Log processing statistics."""
@@ -391,18 +924,86 @@ class RSSProcessorApp:
         logger.info("=" * 40)
         logger.info(f"Processing complete:")
         logger.info(f"- Feeds processed: {self.process_count}")
+        logger.info(f"- Feeds not modified: {self.unchanged_count}")
+        logger.info(f"- Feeds skipped: {self.skipped_count}")
+        logger.info(f"- Feeds not due: {self.not_due_count}")
+        logger.info(f"- Files changed: {self.changed_files}")
+        if self.dedup_enabled:
+            logger.info(f"- Duplicate entries: {int(metrics.counters.get('duplicates', 0))} "
+                        f"({int(metrics.counters.get('dedup_hits', 0))} summaries reused, "
+                        f"{int(metrics.counters.get('duplicates_dropped', 0))} dropped)")
         logger.info(f"- Errors encountered: {self.error_count}")
         logger.info(f"- Total AI cost: ${self.total_cost:.6f}")
         logger.info(f"- Total runtime: {elapsed_time:.2f} seconds")
+        for stage, seconds in sorted(metrics.stage_seconds.items(), key=lambda kv: kv[1], reverse=True):
+            logger.info(f"- Time in {stage}: {seconds:.2f} seconds ({metrics.stage_calls[stage]} calls)")
+        for health in unhealthy_report(self.feed_health):
+            logger.info(f"- Unhealthy feed {health['name']}: {health['failures']} failures in a row, "
+                        f"last error: {health.get('last_error', '')}")
         logger.info("=" * 40)
 
-    async def run(self) -> None:
-        """Run the RSS processor application."""
+    def write_metrics(self) -> None:
+        """Write the machine-readable run report, and Prometheus metrics if configured."""
+        metrics.count("feeds_processed", self.process_count)
+        metrics.count("feeds_not_modified", self.unchanged_count)
+        metrics.count("feeds_failed", self.error_count)
+        metrics.count("files_changed", self.changed_files)
+        metrics.sections["unhealthy_feeds"] = unhealthy_report(self.feed_health)
+        metrics.write(METRICS_PATH, os.getenv("METRICS_PROMETHEUS_PATH", ""))
+
+    def reset_stats(self) -> None:
+        """Reset the counters and metrics before a daemon cycle."""
+        self.total_cost = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.process_count = 0
+        self.error_count = 0
+        self.unchanged_count = 0
+        self.skipped_count = 0
+        self.not_due_count = 0
+        self.changed_files = 0
+        self.item_feeds.clear()
+        self.start_time = time.time()
+        metrics.reset()
+
+    def finish_run(self) -> None:
+        """Render the index pages, then record and report the run."""
+        # Store the health and next poll time of every feed polled
+        feed_state.flush()
+
+        # Summaries of the entries in the feeds have been moved to the new
+        # cache keys by now, drop the legacy keys of the other ones
+        cache.finish_legacy_migration()
+
+        # Generate HTML index and OPML
+        with metrics.timer("render_index"):
+            self.render_html()
+            self.output_opml()
+        
+        # Record cost and log stats
+        self.record_cost()
+        self.log_stats()
+        self.write_metrics()
+
+    async def run(self, daemon: bool = False) -> None:
+        """
+        Run the RSS processor application.
+
+        Args:
+            daemon: Keep running and poll each feed on its own schedule,
+                instead of processing every feed once
+        """
         # Initialize the application
         self.init()
         
         # Load configuration
         rss_cfg = get_config()
+        self.compile_filters(rss_cfg)
+
+        if daemon:
+            async with self.fetcher, self.summarizer:
+                await self.run_daemon(rss_cfg)
+            return
         
         # Process each feed group
         tasks = []
@@ -411,24 +1012,147 @@ class RSSProcessorApp:
             for rss in group_items:
                 tasks.append(self.process_rss_feed(rss))
         
-        # Wait for all feeds to be processed
+        # Wait for all feeds to be processed, downloading concurrently
+        # over one pooled session and summarizing through one shared queue
         if tasks:
-            await asyncio.gather(*tasks)
+            async with self.fetcher, self.summarizer:
+                await asyncio.gather(*tasks)
         
-        # Generate HTML index and OPML
-        self.render_html()
-        self.output_opml()
+        self.finish_run()
+
+    async def run_daemon(self, rss_cfg: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        Poll every feed on its own schedule until SIGINT or SIGTERM.
+
+        The cache, compiled filters and templates, HTTP pool and summary
+        queue stay warm between polls. Feeds wait in a priority queue ordered
+        by their next due time; each wake-up processes the feeds that are due,
+        then re-renders the index and writes the metrics of that cycle. The
+        config is reloaded when the file changes.
         
-        # Record cost and log stats
-        self.record_cost()
-        self.log_stats()
+        Args:
+            rss_cfg: Feed groups from the config
+        """
+        stop = asyncio.Event()
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
 
+        feeds: Dict[str, Dict[str, Any]] = {}
+        # Feeds added or changed by a config reload, polled at once
+        forced: Set[str] = set()
+        scheduler = FeedScheduler()
+        config_mtime = os.path.getmtime(CONFIG_PATH)
 
-async def main():
-    """Run the RSS processor application."""
+        def load_feeds(cfg: Dict[str, List[Dict[str, Any]]], reload: bool = False) -> None:
+            current = {rss["name"]: rss for group_items in cfg.values() for rss in group_items}
+            for name in set(feeds) - set(current):
+                scheduler.remove(name)
+                forced.discard(name)
+                self.html_items.pop(name, None)
+            for name, rss in current.items():
+                if name not in scheduler or rss != feeds.get(name):
+                    scheduler.schedule(name, time.time())
+                    if reload:
+                        forced.add(name)
+            feeds.clear()
+            feeds.update(current)
+
+        async def poll(rss: Dict[str, Any]) -> None:
+            force = rss["name"] in forced
+            forced.discard(rss["name"])
+            state = await self.process_rss_feed(rss, force) or {}
+            due = max(state.get("next_poll", 0), state.get("health", {}).get("open_until", 0))
+            if due <= time.time():
+                due = self.poll_policy.next_due(rss, state)
+            scheduler.schedule(rss["name"], due)
+            logger.info(f"Next poll of {rss.get('text', 'Unknown feed')} at "
+                        f"{datetime.datetime.fromtimestamp(due).strftime('%Y-%m-%d %H:%M')}")
+
+        load_feeds(rss_cfg)
+        logger.info(f"Daemon started with {len(feeds)} feeds")
+        while not stop.is_set():
+            # Pick up config changes
+            try:
+                mtime = os.path.getmtime(CONFIG_PATH)
+                if mtime != config_mtime:
+                    config_mtime = mtime
+                    rss_cfg = get_config()
+                    self.compile_filters(rss_cfg)
+                    load_feeds(rss_cfg, reload=True)
+                    logger.info(f"Config reloaded with {len(feeds)} feeds")
+            except Exception as e:
+                logger.error(f"Error reloading config: {str(e)}", exc_info=True)
+
+            due = scheduler.pop_due()
+            if due:
+                self.reset_stats()
+                await asyncio.gather(*(poll(feeds[name]) for name in due))
+                self.finish_run()
+
+                # Apply the retention limits a one-shot run applies on exit
+                cache.evict()
+                if self.dedup_enabled:
+                    dedup_index.prune()
+
+            next_due = scheduler.next_due()
+            timeout = 60.0 if next_due is None else min(60.0, max(0.0, next_due - time.time()))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Daemon stopped")
+
+
+async def main(daemon: bool = False, force: bool = False):
+    """
+    Run the RSS processor application.
+
+    Args:
+        daemon: Keep running and poll each feed on its own schedule
+        force: Process every feed, even those that are not due yet
+    """
     app = RSSProcessorApp()
-    await app.run()
+    app.force = force
+
+    # Parse and filter feeds in worker processes, 0 to do it on the event loop.
+    # The workers are started by a fork server (or spawned), never forked from
+    # this process once the HTTP session and its resolver threads exist.
+    parse_workers = get_env_int("PARSE_WORKERS", 0)
+    if parse_workers > 0:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        app.parse_pool = ProcessPoolExecutor(max_workers=parse_workers,
+                                             mp_context=multiprocessing.get_context(method))
+
+    try:
+        if not get_env_int("PROFILE", 0):
+            await app.run(daemon)
+            return
+
+        # Profile the whole run, writing the stats for `python -m pstats` or snakeviz
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await app.run(daemon)
+        finally:
+            profiler.disable()
+            profiler.dump_stats(PROFILE_PATH)
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(30)
+            logger.info(f"Profile saved to: {PROFILE_PATH}\n{stream.getvalue()}")
+    finally:
+        if app.parse_pool is not None:
+            app.parse_pool.shutdown()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Fetch, filter and summarize the configured RSS feeds")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and poll each feed on its own schedule")
+    parser.add_argument("--force", action="store_true",
+                        help="Process every feed, even those that are not due yet")
+    args = parser.parse_args()
+    asyncio.run(main(args.daemon, args.force))
@@ -8,16 +8,28 @@ load_dotenv()
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 absolute = partial(os.path.join, BASE_DIR)
 
-LOG_DIR = absolute("log")
-DOCS_DIR = absolute("docs")
+# The config, the output and the run data can be relocated, e.g. by the benchmarks
+LOG_DIR = os.getenv("RSS_LOG_DIR") or absolute("log")
+DOCS_DIR = os.getenv("RSS_DOCS_DIR") or absolute("docs")
+DATA_DIR = os.getenv("RSS_DATA_DIR") or absolute("resource")
+METRICS_PATH = os.path.join(LOG_DIR, "metrics.json")
+PROFILE_PATH = os.path.join(LOG_DIR, "profile.prof")
 
 RSS_TEMPLATE_PATH = absolute("resource/template.xml")
 RSS_HTML_TEMPLATE_PATH = absolute("resource/template.html")
-CONFIG_PATH = absolute("resource/config.yml")
+TEMPLATE_CACHE_DIR = os.path.join(DATA_DIR, "template_cache")
+CONFIG_PATH = os.getenv("RSS_CONFIG_PATH") or absolute("resource/config.yml")
 
 # Allow customization of BASE_URL through environment variables
 BASE_URL = os.getenv("RSS_BASE_URL", "https://www.dcts.top/rssdocs/")
 
-CACHE_PATH = absolute("resource/cache.pkl")
+CACHE_PATH = os.path.join(DATA_DIR, "cache.db")
+LEGACY_CACHE_PATH = os.path.join(DATA_DIR, "cache.pkl")
 
-COST_RECORD_PATH = absolute("resource/cost.xlsx")
\ No newline at end of file
+STATE_DIR = os.path.join(DATA_DIR, "state")
+FEED_STATUS_PATH = os.path.join(DATA_DIR, "feed_status.json")
+
+DEDUP_PATH = os.path.join(DATA_DIR, "dedup.db")
+
+COST_RECORD_PATH = os.path.join(DATA_DIR, "cost.xlsx")
+COST_LEDGER_PATH = os.path.join(DATA_DIR, "cost.csv")
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# 将 AI 费用账本 resource/cost.csv 导出为 resource/cost.xlsx
+python -m src.ledger --ledger ./resource/cost.csv --xlsx ./resource/cost.xlsx
@@ -1,42 +1,57 @@
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
+
+from openai import (APIConnectionError, APIStatusError, AsyncOpenAI, OpenAI,
+                    RateLimitError)
+
+from src.metrics import metrics
 
-from openai import OpenAI
 from .openai_price_cost import calculate_pricing
+from .ratelimit import backoff_delay, get_limiter, parse_retry_after
+from .tokens import count_tokens, split_chunks, token_budget, truncate
 
 logger = logging.getLogger()
 
 # 移除全局客户端
 # client = OpenAI()
 
-def gpt_summary(query: str, model: str, client: Optional[OpenAI] = None) -> Dict[str, Any]:
+# Bump whenever the prompt changes, so cached summaries are regenerated
+PROMPT_VERSION = 1
+CACHE_KEY_VERSION = 2
+
+# Long articles are summarized in at most this many chunks, the rest is dropped
+MAX_SUMMARY_CHUNKS = 8
+
+
+def summary_cache_key(entry_id: str, text: str, model: str) -> str:
     """
-    Generate a summary of the provided text using OpenAI's API.
-    
+    Build the cache key of a summary.
+
+    The key covers everything the summary depends on: the full entry id, the
+    article content, the model and the prompt version.
+
     Args:
-        query: The text to summarize
-        model: The OpenAI model to use
-        client: OpenAI client instance. If None, will create a new client.
-        
+        entry_id: Full id of the feed entry
+        text: Cleaned article text
+        model: Model used for summarizing
+
     Returns:
-        Dictionary containing the summary, cost, and token usage
+        Versioned cache key
     """
-    # Define a default response structure
-    response = {
-        "summary": "",
-        "price": 0,
-        "tokens": 0
-    }
+    digest = hashlib.sha256()
+    for part in (entry_id, hashlib.sha256(text.encode("utf-8")).hexdigest(), model, str(PROMPT_VERSION)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return f"v{CACHE_KEY_VERSION}:{digest.hexdigest()}"
 
-    # Early exit for short queries
-    if len(query) < 400:
-        logger.debug(
-            f"Query too short (Length: {len(query)}), skipping request.")
-        return response
 
-    # Construct the prompt
-    prompt = f"""
+def build_prompt(query: str) -> str:
+    """Build the summarization prompt for an article."""
+    return f"""
     假设你是一位多语言的文字编辑工作者,有丰富的文字内容创作经验,对于<>括起来的文本,我需要你
     
     1. 生成4个关键词
@@ -51,6 +66,119 @@ def gpt_summary(query: str, model: str, client: Optional[OpenAI] = None) -> Dict
     Text: <{query}>
     """
 
+
+def build_chunk_prompt(chunk: str, index: int, total: int) -> str:
+    """Build the prompt summarizing one part of a long article."""
+    return f"""
+    以下<>括起来的文本是一篇长文的第{index}/{total}部分,请使用中文概括这一部分提出的关键论点,
+    要包含原文核心思想和概念,不增加自己的解释,不超过5句话
+    
+    Text: <{chunk}>
+    """
+
+
+def build_reduce_prompt(partials: List[str]) -> str:
+    """Build the prompt merging the summaries of all parts of a long article."""
+    joined = "\n".join(f"{i}. {partial}" for i, partial in enumerate(partials, 1))
+    return build_prompt(f"以下是同一篇文章各部分的概括:\n{joined}")
+
+
+def build_batch_prompt(articles: Dict[str, str]) -> str:
+    """Build one prompt summarizing several articles, answered as JSON."""
+    texts = "\n\n".join(f"Article [{article_id}]: <{text}>" for article_id, text in articles.items())
+    return f"""
+    假设你是一位多语言的文字编辑工作者,有丰富的文字内容创作经验,下面有多篇以 Article [id] 开头、<>括起来的文本,对于每一篇,我需要你
+    
+    1. 生成4个关键词
+    2. 使用中文简要总结文中提出的关键论点,要包含原文核心思想和概念,不增加自己的解释,不超过8句话
+
+    请只返回如下格式的 JSON,每篇文章对应一项:
+    {{"summaries": [{{"id": "<文章 id>", "summary": "关键词: <提取出来的关键词,使用逗号分割><br><br>总结: <中文概括>"}}]}}
+    
+    {texts}
+    """
+
+
+def empty_response() -> Dict[str, Any]:
+    """Default response structure of a summary request."""
+    return {
+        "summary": "",
+        "price": 0,
+        "tokens": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0
+    }
+
+
+def merge_responses(responses: List[Dict[str, Any]], summary: str) -> Dict[str, Any]:
+    """Combine the cost and token usage of several requests into one response."""
+    response = empty_response()
+    response.update({
+        "price": sum(r["price"] for r in responses),
+        "tokens": sum(r["tokens"] for r in responses),
+        "prompt_tokens": sum(r["prompt_tokens"] for r in responses),
+        "completion_tokens": sum(r["completion_tokens"] for r in responses),
+        "summary": summary
+    })
+    return response
+
+
+def parse_completion(chat_completion: Any, model: str) -> Dict[str, Any]:
+    """
+    Turn a chat completion into a summary response.
+
+    Args:
+        chat_completion: Chat completion returned by the OpenAI client
+        model: The model the completion was requested from
+
+    Returns:
+        Dictionary containing the summary, cost, and token usage
+    """
+    # Calculate the cost and total tokens used
+    usage = chat_completion.usage
+    prompt_tokens = usage.prompt_tokens if usage else 0
+    completion_tokens = usage.completion_tokens if usage else 0
+    
+    cost = calculate_pricing(
+        model=model,
+        token_input=prompt_tokens,
+        token_output=completion_tokens
+    ) or 0
+
+    # Extract content from the response
+    content = chat_completion.choices[0].message.content
+
+    response = empty_response()
+    response.update({
+        "price": cost,
+        "tokens": usage.total_tokens if usage else 0,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "summary": content or ""
+    })
+    logger.debug(
+        f"GPT Summary Response: {json.dumps(response, indent=2, ensure_ascii=False)}")
+    return response
+
+
+def gpt_summary(query: str, model: str, client: Optional[OpenAI] = None) -> Dict[str, Any]:
+    """
+    Generate a summary of the provided text using OpenAI's API.
+    
+    Args:
+        query: The text to summarize
+        model: The OpenAI model to use
+        client: OpenAI client instance. If None, will create a new client.
+        
+    Returns:
+        Dictionary containing the summary, cost, and token usage
+    """
+    # Early exit for short queries
+    if len(query) < 400:
+        logger.debug(
+            f"Query too short (Length: {len(query)}), skipping request.")
+        return empty_response()
+
     try:
         # 如果没有提供客户端，则创建一个新的客户端
         if client is None:
@@ -60,33 +188,190 @@ def gpt_summary(query: str, model: str, client: Optional[OpenAI] = None) -> Dict
         # Request GPT completion using the provided or new client
         chat_completion = client.chat.completions.create(
             model=model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=[{"role": "user", "content": build_prompt(query)}],
             timeout=30
         )
+        return parse_completion(chat_completion, model)
+
+    except Exception as e:
+        logger.error(f"Error in GPT completion: {str(e)}", exc_info=True)
+        return empty_response()
+
+
+async def request_completion(client: AsyncOpenAI, model: str, messages: List[Dict[str, str]],
+                             max_retries: int = 4, max_tokens_estimate: int = 512,
+                             **kwargs: Any) -> Any:
+    """
+    Request a chat completion within the rate limits of the endpoint.
+
+    Requests wait on the shared rate limiter of the client's base URL and
+    the model. Rate-limit (429), server (5xx) and connection errors are
+    retried with exponential backoff and jitter, honoring `Retry-After`.
+    
+    Args:
+        client: AsyncOpenAI client instance
+        model: The OpenAI model to use
+        messages: Chat messages
+        max_retries: Number of retries after the first attempt
+        max_tokens_estimate: Completion tokens to reserve for the request
+        **kwargs: Extra arguments for `chat.completions.create`
         
-        # Calculate the cost and total tokens used
-        total_tokens = chat_completion.usage.total_tokens
+    Returns:
+        The chat completion
         
-        # cost = calculate_pricing(
-        #     model=model,
-        #     token_input=chat_completion.usage.prompt_tokens,
-        #     token_output=chat_completion.usage.completion_tokens
-        # )
-
-        # Extract content from the response
-        content = chat_completion.choices[0].message.content
-
-        # Populate response
-        response.update({
-            "price": 0,
-            "tokens": total_tokens,
-            "summary": content or ""
-        })
+    Raises:
+        openai.OpenAIError: If the request still fails after all retries
+    """
+    limiter = get_limiter(str(client.base_url), model)
+    estimated = sum(count_tokens(m["content"], model) for m in messages) + max_tokens_estimate
+
+    for attempt in range(max_retries + 1):
+        await limiter.acquire(estimated)
+        start = time.perf_counter()
+        try:
+            metrics.count("llm_requests")
+            raw = await client.chat.completions.with_raw_response.create(
+                model=model, messages=messages, **kwargs)
+            metrics.observe("llm_latency", time.perf_counter() - start)
+            limiter.update_from_headers(raw.headers)
+            chat_completion = raw.parse()
+            if chat_completion.usage:
+                limiter.settle(estimated, chat_completion.usage.total_tokens)
+            return chat_completion
+
+        except (RateLimitError, APIStatusError, APIConnectionError) as e:
+            status = getattr(e, "status_code", None)
+            retryable = status is None or status == 429 or status >= 500
+            metrics.count("llm_errors")
+            if not retryable or attempt == max_retries:
+                raise
+
+            delay = None
+            response = getattr(e, "response", None)
+            if response is not None:
+                limiter.update_from_headers(response.headers)
+                delay = parse_retry_after(response.headers)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            if status == 429:
+                # Hold back every request to this endpoint, not just this one
+                limiter.pause(delay)
+            logger.warning(f"Completion failed ({status or type(e).__name__}), "
+                           f"retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
+
+
+async def gpt_summary_batch_async(articles: Dict[str, str], model: str,
+                                  client: Optional[AsyncOpenAI] = None,
+                                  max_retries: int = 4) -> Dict[str, Any]:
+    """
+    Summarize several articles with a single request.
+
+    The model answers with a JSON object holding one summary per article id.
+    Articles missing from the answer, or all of them if it cannot be parsed,
+    are left out of the returned summaries so the caller can fall back to
+    single requests.
+    
+    Args:
+        articles: Mapping of article id to the text to summarize
+        model: The OpenAI model to use
+        client: AsyncOpenAI client instance. If None, will create a new client.
+        max_retries: Number of retries of failed requests
+        
+    Returns:
+        Dictionary containing the summaries by article id, cost, and token usage
+    """
+    response = empty_response()
+    response["summaries"] = {}
 
+    try:
+        if client is None:
+            client = AsyncOpenAI()
+            logger.debug("Creating new AsyncOpenAI client")
+
+        chat_completion = await request_completion(
+            client,
+            model,
+            [{"role": "user", "content": build_batch_prompt(articles)}],
+            max_retries=max_retries,
+            max_tokens_estimate=512 * len(articles),
+            response_format={"type": "json_object"},
+            timeout=30 * len(articles)
+        )
+        parsed = parse_completion(chat_completion, model)
+        response.update({key: parsed[key] for key in
+                         ("price", "tokens", "prompt_tokens", "completion_tokens")})
+
+        data = json.loads(parsed["summary"])
+        for entry in data.get("summaries", []):
+            article_id = str(entry.get("id", ""))
+            summary = entry.get("summary", "")
+            if article_id in articles and isinstance(summary, str) and summary:
+                response["summaries"][article_id] = summary
+
+    except (ValueError, AttributeError, TypeError) as e:
+        logger.warning(f"Could not parse batched summaries: {str(e)}")
     except Exception as e:
-        logger.error(f"Error in GPT completion: {str(e)}", exc_info=True)
-        return response
+        logger.error(f"Error in batched GPT completion: {str(e)}", exc_info=True)
 
-    logger.debug(
-        f"GPT Summary Response: {json.dumps(response, indent=2, ensure_ascii=False)}")
     return response
+
+
+async def gpt_summary_async(query: str, model: str, client: Optional[AsyncOpenAI] = None,
+                            max_retries: int = 4) -> Dict[str, Any]:
+    """
+    Generate a summary of the provided text using OpenAI's async API.
+
+    Texts over the model's token budget are split into chunks that are
+    summarized one by one and then reduced into a single summary.
+    
+    Args:
+        query: The text to summarize
+        model: The OpenAI model to use
+        client: AsyncOpenAI client instance. If None, will create a new client.
+        max_retries: Number of retries of failed requests
+        
+    Returns:
+        Dictionary containing the summary, cost, and token usage
+    """
+    # Early exit for short queries
+    if len(query) < 400:
+        logger.debug(
+            f"Query too short (Length: {len(query)}), skipping request.")
+        return empty_response()
+
+    # Responses of the requests made so far, so a failure still reports their usage
+    partials: List[Dict[str, Any]] = []
+    try:
+        if client is None:
+            client = AsyncOpenAI()
+            logger.debug("Creating new AsyncOpenAI client")
+
+        async def complete(prompt: str) -> Dict[str, Any]:
+            chat_completion = await request_completion(
+                client,
+                model,
+                [{"role": "user", "content": prompt}],
+                max_retries=max_retries,
+                timeout=30
+            )
+            return parse_completion(chat_completion, model)
+
+        budget = token_budget(model)
+        if count_tokens(query, model) <= budget:
+            return await complete(build_prompt(query))
+
+        # Map: summarize each chunk, reduce: merge the partial summaries
+        chunks = split_chunks(truncate(query, budget * MAX_SUMMARY_CHUNKS, model), budget, model)
+        logger.info(f"Article over token budget ({budget}), summarizing {len(chunks)} chunks")
+        for index, chunk in enumerate(chunks, 1):
+            partials.append(await complete(build_chunk_prompt(chunk, index, len(chunks))))
+        summaries = [p["summary"] for p in partials if p["summary"]]
+        if not summaries:
+            return merge_responses(partials, "")
+        reduced = await complete(build_reduce_prompt(summaries))
+        return merge_responses(partials + [reduced], reduced["summary"])
+
+    except Exception as e:
+        logger.error(f"Error in GPT completion: {str(e)}", exc_info=True)
+        return merge_responses(partials, "")
@@ -93,7 +93,7 @@ def calculate_pricing(model,
                       img_w=0,
                       img_h=0):
 
-    if token_input != 0 and model[0:4] in ['gpt', 'dav', 'bab', 'o1', 'chat'
+    if token_input != 0 and model[0:4] in ['gpt', 'dav', 'bab', 'o1', 'chat', 'deep'
                                            ] and (img_w and img_h) == 0:
 
         token_price = model_price_map.get(model + '-input', 0)
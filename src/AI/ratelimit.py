@@ -0,0 +1,252 @@
+import asyncio
+import email.utils
+import json
+import logging
+import os
+import random
+import re
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger()
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse a rate-limit reset duration such as `1s`, `6m0s` or `20ms`.
+
+    Args:
+        value: Duration string from a response header
+
+    Returns:
+        Seconds, or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Read the delay requested by a `Retry-After`/`retry-after-ms` header.
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        Seconds to wait, or None if the server did not ask for a delay
+    """
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """An async token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize the bucket.
+
+        Args:
+            per_minute: Refill rate and capacity, 0 or less for no limit
+        """
+        self.per_minute = per_minute
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.per_minute <= 0
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        if not self.unlimited:
+            self.tokens = min(self.per_minute,
+                              self.tokens + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def set_rate(self, per_minute: float) -> None:
+        """
+        Change the refill rate, keeping the current fill level.
+
+        A bucket that had no limit starts full, so the first request after
+        the provider announces a limit does not wait for a whole refill.
+        """
+        self.refill()
+        if self.unlimited:
+            self.tokens = float(per_minute)
+        self.per_minute = per_minute
+        self.tokens = min(self.tokens, per_minute)
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available."""
+        self.refill()
+        if self.unlimited:
+            return 0.0
+        # Requests larger than the capacity wait for a full bucket
+        amount = min(amount, self.per_minute)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60 / self.per_minute
+
+    def consume(self, amount: float) -> None:
+        """Take tokens, possibly going negative to settle a debt."""
+        self.refill()
+        if not self.unlimited:
+            self.tokens -= amount
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits for one endpoint and model.
+
+    The limits adapt to the provider's `x-ratelimit-*` headers when present,
+    and `pause` makes every caller back off after a 429.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        """
+        Initialize the limiter.
+
+        Args:
+            rpm: Requests per minute, 0 for no limit
+            tpm: Tokens per minute, 0 for no limit
+        """
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until a request of about `tokens` tokens may be sent.
+
+        Args:
+            tokens: Estimated prompt plus completion tokens of the request
+        """
+        async with self.lock:
+            while True:
+                delay = max(self.paused_until - time.monotonic(),
+                            self.requests.wait_time(1),
+                            self.tokens.wait_time(tokens))
+                if delay <= 0:
+                    break
+                logger.debug(f"Rate limited, waiting {delay:.2f}s")
+                await asyncio.sleep(delay)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real token usage is known."""
+        self.tokens.consume(actual - estimated)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all requests for `seconds`."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Adapt the limits to the provider's rate-limit headers.
+
+        Args:
+            headers: Response headers
+        """
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}", ""))
+            try:
+                if limit and float(limit) != bucket.per_minute:
+                    logger.info(f"Adapting {kind} limit to {limit}/min from response headers")
+                    bucket.set_rate(float(limit))
+                if remaining is not None and float(remaining) <= 0 and reset:
+                    self.pause(reset)
+            except ValueError:
+                continue
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+
+def load_limits(base_url: str, model: str) -> Tuple[float, float]:
+    """
+    Look up the configured limits of an endpoint and model.
+
+    `OPENAI_RATE_LIMITS` holds a JSON object whose keys are
+    `"<base_url>|<model>"`, `"<model>"` or `"<base_url>"`, most specific
+    first, mapping to `{"rpm": ..., "tpm": ...}`. `OPENAI_RPM` and
+    `OPENAI_TPM` are the defaults.
+
+    Args:
+        base_url: API base URL
+        model: Model name
+
+    Returns:
+        Requests and tokens per minute, 0 for no limit
+    """
+    rpm = float(os.getenv("OPENAI_RPM", "0") or 0)
+    tpm = float(os.getenv("OPENAI_TPM", "0") or 0)
+    try:
+        overrides: Dict[str, Any] = json.loads(os.getenv("OPENAI_RATE_LIMITS", "") or "{}")
+    except ValueError:
+        logger.error("OPENAI_RATE_LIMITS is not valid JSON, ignoring it")
+        overrides = {}
+
+    for key in (f"{base_url}|{model}", model, base_url):
+        if key in overrides:
+            rpm = float(overrides[key].get("rpm", rpm))
+            tpm = float(overrides[key].get("tpm", tpm))
+            break
+    return rpm, tpm
+
+
+def get_limiter(base_url: str, model: str) -> RateLimiter:
+    """
+    Get the shared rate limiter of an endpoint and model.
+
+    Args:
+        base_url: API base URL
+        model: Model name
+
+    Returns:
+        The limiter, created from the configuration on first use
+    """
+    key = (base_url.rstrip("/"), model)
+    if key not in _limiters:
+        rpm, tpm = load_limits(*key)
+        logger.info(f"Rate limits for {model} at {key[0]}: rpm={rpm or 'unlimited'}, "
+                    f"tpm={tpm or 'unlimited'}")
+        _limiters[key] = RateLimiter(rpm, tpm)
+    return _limiters[key]
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+Job = Tuple[Any, asyncio.Future]
+
+
+class SummaryScheduler:
+    """
+    Process-wide scheduler for summary requests.
+
+    All feeds submit their items to one bounded queue, drained by a fixed
+    number of worker tasks. The number of workers is the global limit on
+    in-flight LLM requests, however many feeds are processed at once.
+
+    With a `batch_size` over 1, a worker takes up to that many queued items
+    at once and hands them to `batch_handler` together, which returns one
+    result per item.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], concurrency: int = 5,
+                 queue_size: int = 0, batch_size: int = 1,
+                 batch_handler: Optional[Callable[[List[Any]], Awaitable[List[Any]]]] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            handler: Coroutine function summarizing a single item
+            concurrency: Number of requests processed at the same time
+            queue_size: Maximum number of queued items, defaults to enough for
+                two full batches per worker
+            batch_size: Maximum number of items handled together
+            batch_handler: Coroutine function summarizing several items
+        """
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size) if batch_handler else 1
+        self.batch_handler = batch_handler
+        self.queue_size = queue_size or self.concurrency * 2 * self.batch_size
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker tasks. Must be called from a running event loop."""
+        if self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.workers = [asyncio.ensure_future(self.worker()) for _ in range(self.concurrency)]
+        logger.debug(f"Summary scheduler started with {self.concurrency} workers")
+
+    async def close(self) -> None:
+        """Wait for queued items to finish and stop the workers."""
+        if not self.workers:
+            return
+        await self.queue.join()
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def __aenter__(self) -> "SummaryScheduler":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def worker(self) -> None:
+        """Take items from the queue and summarize them, one batch at a time."""
+        while True:
+            jobs: List[Job] = [await self.queue.get()]
+            while len(jobs) < self.batch_size:
+                try:
+                    jobs.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                if len(jobs) > 1:
+                    results = await self.batch_handler([item for item, _ in jobs])
+                else:
+                    results = [await self.handler(jobs[0][0])]
+                for (_, future), result in zip(jobs, results):
+                    if not future.done():
+                        future.set_result(result)
+                for _, future in jobs:
+                    if not future.done():
+                        future.set_result(None)
+            except Exception as e:
+                for _, future in jobs:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in jobs:
+                    self.queue.task_done()
+
+    async def submit(self, item: Any) -> asyncio.Future:
+        """
+        Queue an item, waiting while the queue is full.
+
+        Args:
+            item: Item to summarize
+
+        Returns:
+            Future resolved with the result once the item was summarized
+        """
+        if not self.workers:
+            await self.start()
+        future = asyncio.get_event_loop().create_future()
+        await self.queue.put((item, future))
+        return future
+
+    async def summarize(self, items: Iterable[Any]) -> List[Any]:
+        """
+        Summarize items and wait for all of them to finish.
+
+        Args:
+            items: Items to summarize
+
+        Returns:
+            The result of each item, None for items that failed
+        """
+        futures = [await self.submit(item) for item in items]
+        if not futures:
+            return []
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [None if isinstance(result, Exception) else result for result in results]
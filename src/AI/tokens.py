@@ -0,0 +1,162 @@
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import Any, List, Optional
+
+logger = logging.getLogger()
+
+# Tokens of article text allowed in a single prompt, per model
+MODEL_TOKEN_BUDGETS = {
+    "deepseek-chat": 12000,
+    "gpt-4o-mini": 12000,
+    "gpt-4o": 12000,
+    "gpt-4-turbo": 12000,
+    "gpt-4": 6000,
+    "gpt-3.5-turbo": 6000,
+}
+DEFAULT_TOKEN_BUDGET = 6000
+
+_CJK_RE = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> Optional[Any]:
+    """
+    Get the local tokenizer of a model.
+
+    Args:
+        model: Model name
+
+    Returns:
+        A tiktoken encoding, or None if tiktoken or its data is unavailable
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.debug("tiktoken not installed, estimating token counts")
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer for {model}, estimating token counts: {str(e)}")
+        return None
+
+    # Models of other providers (e.g. deepseek) are close enough to cl100k
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer for {model}, estimating token counts: {str(e)}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens of a text.
+
+    Without a tokenizer, CJK characters count as one token each and other
+    text as one token per four characters.
+
+    Args:
+        text: Text to count
+        model: Model name
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def token_budget(model: str) -> int:
+    """Tokens of article text allowed in a single prompt for `model`."""
+    override = os.getenv("SUMMARY_TOKEN_BUDGET")
+    if override and override.isdigit():
+        return int(override)
+    for name in sorted(MODEL_TOKEN_BUDGETS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_TOKEN_BUDGETS[name]
+    return DEFAULT_TOKEN_BUDGET
+
+
+def truncate(text: str, budget: int, model: str) -> str:
+    """
+    Trim a text to at most `budget` tokens.
+
+    Args:
+        text: Text to trim
+        budget: Maximum number of tokens
+        model: Model name
+
+    Returns:
+        The trimmed text
+    """
+    encoding = get_encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= budget:
+            return text
+        # Drop a character split in half at the cut
+        head = encoding.decode(tokens[:budget]).rstrip("\ufffd")
+        if text.startswith(head):
+            return head
+
+    if count_tokens(text, model) <= budget:
+        return text
+    # Binary search the longest prefix within the budget
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle], model) <= budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def split_chunks(text: str, budget: int, model: str) -> List[str]:
+    """
+    Split a text into chunks of at most `budget` tokens along paragraph boundaries.
+
+    Args:
+        text: Text to split
+        budget: Maximum number of tokens per chunk
+        model: Model name
+
+    Returns:
+        List of chunks
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for paragraph in text.split("\n"):
+        tokens = count_tokens(paragraph, model) + 1
+        if current and current_tokens + tokens > budget:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+
+        # A single paragraph over the budget is cut into several chunks
+        while tokens > budget:
+            head = truncate(paragraph, budget, model)
+            if not head:
+                break
+            chunks.append(head)
+            paragraph = paragraph[len(head):]
+            tokens = count_tokens(paragraph, model) + 1
+
+        if paragraph:
+            current.append(paragraph)
+            current_tokens += tokens
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
@@ -2,127 +2,307 @@ import atexit
 import logging
 import os
 import pickle
-from typing import Dict, Optional, Any
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+# Summary keys used before versioned keys: the first 6 hex digits of an md5
+LEGACY_KEY_GLOB = "[0-9a-f]" * 6
 
 
 class CacheKit:
-    """A simple caching mechanism for storing and retrieving values by key."""
-    
-    def __init__(self, file_path: str):
+    """
+    A key-value cache backed by an indexed SQLite database.
+
+    Lookups are point queries, so nothing is loaded into memory up front, and
+    every `set` is committed immediately, so a crash never loses finished work.
+    Each entry records when it was created and last used; `evict` drops
+    entries past their time-to-live and then the least recently used ones
+    until the entry count and byte size limits are met.
+    """
+
+    def __init__(self, file_path: str, legacy_path: Optional[str] = None,
+                 max_entries: int = 0, max_bytes: int = 0, ttl: float = 0):
         """
         Initialize the cache.
-        
+
         Args:
-            file_path: Path to the cache file
+            file_path: Path to the SQLite database file
+            legacy_path: Path to a pickled dict cache to import once
+            max_entries: Maximum number of entries to keep, 0 for no limit
+            max_bytes: Maximum total size of the values in bytes, 0 for no limit
+            ttl: Seconds an entry is kept after its last use, 0 for no limit
         """
         self.file_path = file_path
-        self.cache: Dict[str, Any] = {}
+        self.legacy_path = legacy_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = threading.RLock()
         self.logger = logging.getLogger()
         self.loaded = False
+        self.migrating_keys = False
         atexit.register(self.save_cache)
 
     def load_cache(self) -> None:
-        """Load the cache from disk."""
-        self.logger.debug(f"Loading cache from: {self.file_path}")
-        try:
-            if os.path.exists(self.file_path) and os.path.getsize(self.file_path) > 0:
-                with open(self.file_path, 'rb') as f:
-                    self.cache = pickle.load(f)
-                self.logger.info(f"Cache loaded successfully with {len(self.cache)} entries")
-            else:
-                self.logger.info("Cache file doesn't exist or is empty, creating a new cache")
-                self.cache = {}
+        """Open the database, creating the schema and migrating the legacy cache if needed."""
+        with self.lock:
+            if self.loaded:
+                return
+            self.logger.debug(f"Opening cache database: {self.file_path}")
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+
+            self.conn = sqlite3.connect(self.file_path, check_same_thread=False,
+                                        isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=FULL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL, size INTEGER NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self.migrate_schema()
             self.loaded = True
+            self.migrate_legacy_cache()
+            self.migrating_keys = not self.get_meta("legacy_keys_migrated")
+
+            count = self.conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            self.logger.info(f"Cache opened successfully with {count} entries")
+
+    def migrate_schema(self) -> None:
+        """Add the bookkeeping columns used by eviction to older databases."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cache)")}
+        if "accessed_at" not in columns:
+            self.conn.execute("ALTER TABLE cache ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            self.conn.execute("UPDATE cache SET accessed_at = created_at")
+        if "size" not in columns:
+            self.conn.execute("ALTER TABLE cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("UPDATE cache SET size = LENGTH(CAST(value AS BLOB))")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def migrate_legacy_cache(self) -> None:
+        """Import the pickled dict cache once, if one exists."""
+        if not self.legacy_path or self.get_meta("legacy_migrated"):
+            return
+        if not os.path.exists(self.legacy_path) or os.path.getsize(self.legacy_path) == 0:
+            return
+
+        try:
+            with open(self.legacy_path, 'rb') as f:
+                legacy = pickle.load(f)
         except (pickle.PickleError, EOFError) as e:
-            self.logger.error(f"Error loading cache, creating a new one: {str(e)}")
-            self.cache = {}
-            self.loaded = True
+            self.logger.error(f"Error loading legacy cache, skipping migration: {str(e)}")
+            return
 
-    def save_cache(self) -> None:
-        """Save the cache to disk."""
+        now = time.time()
+        rows = [(k, v, now, now, len(v.encode("utf-8"))) for k, v in legacy.items()
+                if isinstance(k, str) and isinstance(v, str)]
+        with self.conn:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO cache (key, value, created_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                              ("legacy_migrated", str(now)))
+        self.logger.info(f"Migrated {len(rows)} entries from legacy cache: {self.legacy_path}")
+
+    def claim_legacy(self, key: str) -> str:
+        """
+        Take the value stored under a legacy key, during the run that migrates them.
+
+        Legacy keys are only 24 bits of an md5 digest, so entries first seen
+        later would now and then collide with one of them. Only the first
+        run after the upgrade, which processes the entries the legacy cache
+        was filled from, may claim them; `finish_legacy_migration` then
+        deletes the rest.
+
+        Args:
+            key: The legacy cache key
+
+        Returns:
+            The value, or empty string if not found or the migration is over
+        """
         if not self.loaded:
-            self.logger.debug("Cache not loaded, skipping save")
+            self.load_cache()
+        if not self.migrating_keys:
+            return ""
+
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM cache WHERE key = ? AND key GLOB ?",
+                                    (key, LEGACY_KEY_GLOB)).fetchone()
+            if row:
+                self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        return row[0] if row else ""
+
+    def finish_legacy_migration(self) -> None:
+        """Delete the legacy keys nobody claimed and stop looking them up."""
+        if not self.loaded or not self.migrating_keys:
             return
-            
-        self.logger.debug(f"Saving cache with {len(self.cache)} entries")
-        try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-            
-            # Safely write to a temporary file first, then rename
-            temp_path = f"{self.file_path}.tmp"
-            with open(temp_path, 'wb') as f:
-                pickle.dump(self.cache, f)
-            
-            # Replace the original file with the temp file
-            if os.path.exists(self.file_path):
-                os.replace(temp_path, self.file_path)
-            else:
-                os.rename(temp_path, self.file_path)
-                
-            self.logger.info(f"Cache saved successfully with {len(self.cache)} entries")
-        except Exception as e:
-            self.logger.error(f"Error saving cache: {str(e)}")
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            dropped = self.conn.execute("DELETE FROM cache WHERE key GLOB ?",
+                                        (LEGACY_KEY_GLOB,)).rowcount
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                              ("legacy_keys_migrated", str(time.time())))
+        self.migrating_keys = False
+        if dropped:
+            self.logger.info(f"Dropped {dropped} unclaimed legacy cache entries")
+
+    def get_meta(self, key: str) -> str:
+        """Get a value from the metadata table."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else ""
+
+    def evict(self) -> int:
+        """
+        Apply the eviction policy.
+
+        Returns:
+            Number of evicted entries
+        """
+        if not self.loaded:
+            self.load_cache()
+
+        evicted = 0
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            if self.ttl > 0:
+                evicted += self.conn.execute(
+                    "DELETE FROM cache WHERE accessed_at < ?", (time.time() - self.ttl,)).rowcount
+            if self.max_entries > 0:
+                evicted += self.conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)).rowcount
+            if self.max_bytes > 0:
+                evicted += self.conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    "SELECT key FROM (SELECT key, SUM(size) OVER "
+                    "(ORDER BY accessed_at DESC, key ROWS UNBOUNDED PRECEDING) AS total FROM cache) "
+                    "WHERE total > ?)",
+                    (self.max_bytes,)).rowcount
+
+        if evicted:
+            self.logger.info(f"Evicted {evicted} cache entries")
+        return evicted
+
+    def compact(self) -> None:
+        """Evict dead entries and rewrite the database file without them."""
+        self.evict()
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.execute("VACUUM")
+        self.logger.info(f"Cache compacted ({os.path.getsize(self.file_path)} bytes)")
+
+    def stats(self) -> Tuple[int, int]:
+        """
+        Get the size of the cache.
+
+        Returns:
+            Number of entries and total size of the values in bytes
+        """
+        if not self.loaded:
+            self.load_cache()
+
+        with self.lock:
+            count, total = self.conn.execute("SELECT COUNT(*), TOTAL(size) FROM cache").fetchone()
+        return count, int(total)
+
+    def save_cache(self) -> None:
+        """Apply the eviction policy, checkpoint the write-ahead log and close the database."""
+        with self.lock:
+            if not self.loaded:
+                self.logger.debug("Cache not loaded, skipping save")
+                return
+            try:
+                if self.evict():
+                    self.compact()
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self.conn.close()
+                self.logger.info("Cache closed successfully")
+            except sqlite3.Error as e:
+                self.logger.error(f"Error closing cache: {str(e)}")
+            finally:
+                self.conn = None
+                self.loaded = False
 
     def get(self, key: str) -> str:
         """
         Get a value from the cache.
-        
+
         Args:
             key: The cache key
-            
+
         Returns:
             The cached value or empty string if not found
         """
         if not self.loaded:
             self.load_cache()
-            
-        value = self.cache.get(key, "")
+
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?",
+                                  (time.time(), key))
+        value = row[0] if row else ""
         self.logger.debug(f"Cache get: {key} -> {'[Found]' if value else '[Not Found]'}")
         return value
 
     def set(self, key: str, value: str) -> None:
         """
-        Set a value in the cache.
-        
+        Set a value in the cache, committing it to disk immediately.
+
         Args:
             key: The cache key
             value: The value to cache
         """
         if not self.loaded:
             self.load_cache()
-            
+
         self.logger.debug(f"Cache set: {key}")
-        self.cache[key] = value
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, len(value.encode("utf-8"))))
 
     def delete(self, key: str) -> None:
         """
         Delete a value from the cache.
-        
+
         Args:
             key: The cache key to delete
         """
         if not self.loaded:
             self.load_cache()
-            
-        if key in self.cache:
-            del self.cache[key]
+
+        with self.lock:
+            deleted = self.conn.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount
+        if deleted:
             self.logger.debug(f"Cache delete: {key}")
-            
+
     def has(self, key: str) -> bool:
         """
         Check if a key exists in the cache.
-        
+
         Args:
             key: The cache key to check
-            
+
         Returns:
             True if the key exists, False otherwise
         """
         if not self.loaded:
             self.load_cache()
-            
-        exists = key in self.cache
+
+        with self.lock:
+            exists = self.conn.execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone() is not None
         self.logger.debug(f"Cache check: {key} -> {'[Exists]' if exists else '[Does Not Exist]'}")
         return exists
 
@@ -130,6 +310,7 @@ class CacheKit:
         """Clear all entries from the cache."""
         if not self.loaded:
             self.load_cache()
-            
-        self.logger.debug(f"Clearing cache with {len(self.cache)} entries")
-        self.cache = {}
\ No newline at end of file
+
+        self.logger.debug("Clearing cache")
+        with self.lock:
+            self.conn.execute("DELETE FROM cache")
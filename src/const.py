@@ -1,6 +1,7 @@
+import dataclasses
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 
 class FilterType(Enum):
@@ -29,8 +30,18 @@ class FilterField(Enum):
         else:
             raise ValueError(f"Unknown filter field: {s}")
 
-@dataclass
+@dataclass(frozen=True)
 class Item:
+    """
+    One feed entry, immutable and without a per-instance `__dict__`.
+
+    Update an item with `replace`, which returns a new item. The cleaned
+    article text is memoized in a slot of its own and survives pickling,
+    so text cleaned in a parse worker is not cleaned again.
+    """
+    __slots__ = ("title", "link", "summary", "article", "updated", "id", "guid",
+                 "published", "media_content", "media_thumbnail", "_cleaned")
+
     title:str
     link:str
     summary:str
@@ -38,9 +49,43 @@ class Item:
     updated:str
     id:str
     guid:str
-    published:Optional[str] = ""
-    media_content:Optional[Dict] = None
-    media_thumbnail: Optional[Dict] = None
+    published:Optional[str]
+    media_content:Optional[Dict]
+    media_thumbnail: Optional[Dict]
+
+    @property
+    def cleaned(self) -> str:
+        """Plain text of the article, cleaned on first access and memoized."""
+        text = getattr(self, "_cleaned", None)
+        if text is None:
+            from src.filter import clean_html  # src.filter imports this module
+            text = clean_html(self.article)
+            object.__setattr__(self, "_cleaned", text)
+        return text
+
+    def replace(self, **changes: Any) -> "Item":
+        """
+        Return a copy of the item with some fields changed.
+
+        Args:
+            **changes: New field values
+
+        Returns:
+            The new item, keeping the cleaned text unless the article changed
+        """
+        item = dataclasses.replace(self, **changes)
+        text = getattr(self, "_cleaned", None)
+        if text is not None and "article" not in changes:
+            object.__setattr__(item, "_cleaned", text)
+        return item
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Frozen slots cannot be restored by pickle's default setattr
+        fields = tuple(getattr(self, f.name) for f in dataclasses.fields(self))
+        return Item, fields, getattr(self, "_cleaned", None)
+
+    def __setstate__(self, cleaned: Optional[str]) -> None:
+        object.__setattr__(self, "_cleaned", cleaned)
     
 @dataclass
 class HtmlItem:
@@ -0,0 +1,316 @@
+import atexit
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only say where a click came from
+TRACKING_PARAMS = frozenset([
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "spm", "ref", "ref_src", "from", "source", "share_token",
+    "share_source", "isappinstalled", "scene", "clicktime", "enterid", "si",
+])
+TRACKING_PREFIXES = ("utm_",)
+
+FINGERPRINT_BITS = 64
+
+# Fingerprints are split into this many bands of 8 bits and indexed by
+# band, so two fingerprints within 7 bits of each other share a band
+BANDS = 8
+BAND_BITS = FINGERPRINT_BITS // BANDS
+
+# Characters per shingle, and the text fingerprinted
+SHINGLE_SIZE = 4
+FINGERPRINT_CHARS = 3000
+
+# Shorter texts are too alike to tell apart and are matched by URL only
+MIN_FINGERPRINT_CHARS = 200
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize an article link, so copies of it compare equal.
+
+    The scheme, a leading `www.`, default ports, the fragment, tracking
+    parameters, the order of the query and trailing slashes are ignored.
+
+    Args:
+        url: Link of an entry
+
+    Returns:
+        The canonical URL, or the stripped link if it is not an HTTP URL
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return url
+
+    host = parts.hostname
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES))
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    Compute the SimHash of a text, for finding near-duplicates.
+
+    The text is lowercased and stripped of whitespace and punctuation, which
+    works the same for Chinese and for space-separated languages, and split
+    into overlapping character shingles. Texts that differ by a few edits,
+    or by a header or footer added by an aggregator, get fingerprints that
+    differ in a few bits.
+
+    Args:
+        text: Cleaned article text
+
+    Returns:
+        64-bit fingerprint, or None if the text is too short
+    """
+    normalized = _NON_WORD_RE.sub("", text.lower())[:FINGERPRINT_CHARS]
+    if len(normalized) < MIN_FINGERPRINT_CHARS:
+        return None
+
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+              for s in shingles]
+    majority = len(hashes) / 2
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        mask = 1 << bit
+        if sum(1 for h in hashes if h & mask) > majority:
+            fingerprint |= mask
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of bits that differ between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+def band_keys(fingerprint: int) -> Tuple[int, ...]:
+    """Index keys of a fingerprint: each band's bits, tagged with the band number."""
+    mask = (1 << BAND_BITS) - 1
+    return tuple((band << BAND_BITS) | (fingerprint >> (band * BAND_BITS) & mask)
+                 for band in range(BANDS))
+
+
+@dataclass
+class DedupMatch:
+    """The canonical article an entry was resolved to."""
+    article_id: int
+    feed: str
+    duplicate: bool
+    summary: str
+    model: str
+
+
+class DedupIndex:
+    """
+    Cross-feed index of articles, backed by SQLite.
+
+    The first entry seen for a story becomes its canonical article. Entries
+    of other feeds with the same canonical URL, or with a content
+    fingerprint within `distance` bits, resolve to the same article, which
+    holds the one summary shared by every copy. Articles not seen for `ttl`
+    seconds are pruned when the index is opened.
+    """
+
+    def __init__(self, file_path: str, distance: int = 4, ttl: float = 0):
+        """
+        Initialize the index.
+
+        Args:
+            file_path: Path to the SQLite database file
+            distance: Maximum differing fingerprint bits of near-duplicates, at most 7
+            ttl: Seconds an article is kept after it was last seen, 0 for no limit
+        """
+        self.file_path = file_path
+        self.distance = min(distance, BANDS - 1)
+        self.ttl = ttl
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = threading.RLock()
+        self.logger = logging.getLogger()
+        self.loaded = False
+        atexit.register(self.close)
+
+    def load(self) -> None:
+        """Open the database, creating the schema and pruning old articles."""
+        with self.lock:
+            if self.loaded:
+                return
+            self.logger.debug(f"Opening dedup index: {self.file_path}")
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+
+            self.conn = sqlite3.connect(self.file_path, check_same_thread=False,
+                                        isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "id INTEGER PRIMARY KEY, url TEXT NOT NULL, fingerprint TEXT, "
+                "feed TEXT NOT NULL, model TEXT NOT NULL DEFAULT '', "
+                "summary TEXT NOT NULL DEFAULT '', seen_at REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS articles_url ON articles (url)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS articles_seen_at ON articles (seen_at)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "feed TEXT NOT NULL, item_id TEXT NOT NULL, article_id INTEGER NOT NULL, "
+                "PRIMARY KEY (feed, item_id)) WITHOUT ROWID"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS bands ("
+                "band INTEGER NOT NULL, article_id INTEGER NOT NULL, "
+                "PRIMARY KEY (band, article_id)) WITHOUT ROWID"
+            )
+            self.loaded = True
+            self.prune()
+
+            count = self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            self.logger.info(f"Dedup index opened with {count} articles")
+
+    def prune(self) -> int:
+        """
+        Drop articles not seen within the time-to-live, with their entries.
+
+        Returns:
+            Number of pruned articles
+        """
+        if self.ttl <= 0:
+            return 0
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            pruned = self.conn.execute("DELETE FROM articles WHERE seen_at < ?",
+                                       (time.time() - self.ttl,)).rowcount
+            if pruned:
+                self.conn.execute("DELETE FROM entries WHERE article_id NOT IN (SELECT id FROM articles)")
+                self.conn.execute("DELETE FROM bands WHERE article_id NOT IN (SELECT id FROM articles)")
+        if pruned:
+            self.logger.info(f"Pruned {pruned} articles from the dedup index")
+        return pruned
+
+    def resolve(self, feed: str, item_id: str, url: str, fingerprint: Optional[int]) -> DedupMatch:
+        """
+        Find the canonical article of an entry, registering the entry.
+
+        An entry resolved before keeps its article. Otherwise it is matched
+        against the articles of other feeds, first by canonical URL and then
+        by fingerprint, and becomes a new canonical article if none matches.
+
+        Args:
+            feed: Name of the feed of the entry
+            item_id: ID of the entry in its feed
+            url: Canonical URL of the entry
+            fingerprint: SimHash of the entry's text, None to match by URL only
+
+        Returns:
+            The canonical article of the entry
+        """
+        if not self.loaded:
+            self.load()
+
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN")
+            row = self.conn.execute(
+                "SELECT a.id, a.feed, a.fingerprint, a.summary, a.model FROM entries e "
+                "JOIN articles a ON a.id = e.article_id WHERE e.feed = ? AND e.item_id = ?",
+                (feed, item_id)).fetchone()
+            if row and row[1] == feed and fingerprint is not None and row[2] != f"{fingerprint:016x}":
+                # The canonical copy changed, so its summary is stale
+                self.update_fingerprint(row[0], fingerprint)
+                self.conn.execute("UPDATE articles SET url = ?, summary = '', model = '' WHERE id = ?",
+                                  (url, row[0]))
+                row = (row[0], row[1], row[2], "", "")
+            if row is None:
+                row = self.find(feed, url, fingerprint)
+                if row is None:
+                    article_id = self.conn.execute(
+                        "INSERT INTO articles (url, feed, seen_at) VALUES (?, ?, ?)",
+                        (url, feed, now)).lastrowid
+                    if fingerprint is not None:
+                        self.update_fingerprint(article_id, fingerprint)
+                    row = (article_id, feed, None, "", "")
+                self.conn.execute("INSERT OR REPLACE INTO entries (feed, item_id, article_id) VALUES (?, ?, ?)",
+                                  (feed, item_id, row[0]))
+            self.conn.execute("UPDATE articles SET seen_at = ? WHERE id = ?", (now, row[0]))
+
+        article_id, canonical_feed, _, summary, model = row
+        return DedupMatch(article_id, canonical_feed, canonical_feed != feed, summary, model)
+
+    def find(self, feed: str, url: str, fingerprint: Optional[int]) -> Optional[Tuple]:
+        """Find an article of another feed with the same URL or a close fingerprint."""
+        if url:
+            row = self.conn.execute(
+                "SELECT id, feed, fingerprint, summary, model FROM articles "
+                "WHERE url = ? AND feed != ? ORDER BY id LIMIT 1", (url, feed)).fetchone()
+            if row:
+                return row
+        if fingerprint is None:
+            return None
+
+        keys = band_keys(fingerprint)
+        candidates = self.conn.execute(
+            "SELECT DISTINCT a.id, a.feed, a.fingerprint, a.summary, a.model FROM bands b "
+            f"JOIN articles a ON a.id = b.article_id WHERE b.band IN ({','.join('?' * len(keys))}) "
+            "AND a.feed != ?", keys + (feed,)).fetchall()
+        best = None
+        for row in candidates:
+            distance = hamming(fingerprint, int(row[2], 16))
+            if distance <= self.distance and (best is None or distance < best[0]):
+                best = (distance, row)
+        return best[1] if best else None
+
+    def update_fingerprint(self, article_id: int, fingerprint: int) -> None:
+        """Store the fingerprint of an article and index its bands."""
+        self.conn.execute("UPDATE articles SET fingerprint = ? WHERE id = ?",
+                          (f"{fingerprint:016x}", article_id))
+        self.conn.execute("DELETE FROM bands WHERE article_id = ?", (article_id,))
+        self.conn.executemany("INSERT OR IGNORE INTO bands (band, article_id) VALUES (?, ?)",
+                              [(key, article_id) for key in band_keys(fingerprint)])
+
+    def set_summary(self, article_id: int, model: str, summary: str) -> None:
+        """
+        Store the summary shared by every copy of an article.
+
+        Args:
+            article_id: ID of the canonical article
+            model: Model that generated the summary
+            summary: The summary
+        """
+        if not self.loaded:
+            self.load()
+        with self.lock:
+            self.conn.execute("UPDATE articles SET summary = ?, model = ? WHERE id = ?",
+                              (summary, model, article_id))
+
+    def close(self) -> None:
+        """Checkpoint the write-ahead log and close the database."""
+        with self.lock:
+            if not self.loaded:
+                return
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self.conn.close()
+            except sqlite3.Error as e:
+                self.logger.error(f"Error closing dedup index: {str(e)}")
+            finally:
+                self.conn = None
+                self.loaded = False
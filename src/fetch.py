@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger()
+
+USER_AGENT = "RSS-Master/1.0 (+https://github.com/TD21forever/RSS-Master)"
+
+
+@dataclass
+class FetchResult:
+    """Raw response of a single feed download."""
+    url: str
+    status: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+class FeedFetcher:
+    """A shared, connection-pooled async HTTP client for downloading feeds."""
+
+    def __init__(self, concurrency: int = 20, per_host: int = 6, timeout: float = 30):
+        """
+        Initialize the fetcher.
+
+        Args:
+            concurrency: Maximum number of requests in flight across all hosts
+            per_host: Maximum number of pooled connections to a single host
+            timeout: Total timeout of a single request in seconds
+        """
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(0, per_host)
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+
+    async def open(self) -> None:
+        """Create the pooled session. Must be called from a running event loop."""
+        if self.session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": USER_AGENT},
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        logger.debug(f"Fetcher opened (concurrency={self.concurrency}, per_host={self.per_host}, "
+                     f"timeout={self.timeout}s)")
+
+    async def close(self) -> None:
+        """Close the pooled session and release all connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "FeedFetcher":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> FetchResult:
+        """
+        Download a feed.
+
+        Args:
+            url: Feed URL
+            headers: Extra request headers
+
+        Returns:
+            The downloaded response
+
+        Raises:
+            aiohttp.ClientError: On connection errors and HTTP error statuses
+            asyncio.TimeoutError: If the request exceeds the configured timeout
+        """
+        if self.session is None:
+            await self.open()
+
+        async with self.semaphore:
+            start = time.monotonic()
+            async with self.session.get(url, headers=headers) as resp:
+                resp.raise_for_status()
+                content = await resp.read()
+                # feedparser expects lower-cased header names
+                response_headers = {k.lower(): v for k, v in resp.headers.items()}
+                response_headers.setdefault("content-location", str(resp.url))
+                elapsed = time.monotonic() - start
+                logger.debug(f"Fetched {url} ({len(content)} bytes, {elapsed:.2f}s)")
+                return FetchResult(url=url, status=resp.status, content=content,
+                                   headers=response_headers, elapsed=elapsed)
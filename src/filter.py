@@ -1,10 +1,256 @@
 import re
-from typing import List
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
+from lxml import etree
 
 from src.const import FilterField, FilterType, Item
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Keyword lists at least this long are matched with an Aho-Corasick automaton
+AUTOMATON_MIN_KEYWORDS = 10
+
+# Tags dropped with their content, and tags whose text makes up a paragraph
+REMOVED_TAGS = frozenset(['script', 'style', 'img', 'svg', 'iframe', 'form', 'nav', 'header', 'footer', 'aside'])
+TEXT_TAGS = frozenset(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'li'])
+CHUNK_SIZE = 64 * 1024
+
+
+def _extra_cases() -> Dict[int, Tuple[int, ...]]:
+    """Lowercase characters `re.IGNORECASE` treats as equal to other lowercase characters."""
+    try:
+        from re._casefix import _EXTRA_CASES  # Python 3.11+
+        return _EXTRA_CASES
+    except ImportError:
+        import sre_compile
+        return sre_compile._ignorecase_fixes
+
+
+def _fold_table() -> Dict[int, int]:
+    """Map each group of equivalent lowercase characters to its smallest member."""
+    table: Dict[int, int] = {}
+    for char, others in _extra_cases().items():
+        table[char] = min((table.get(char, char),) + tuple(table.get(o, o) for o in others))
+    # Resolve chains, so every member maps straight to the group's minimum
+    for char in list(table):
+        while table[table[char]] != table[char]:
+            table[char] = table[table[char]]
+    return {char: target for char, target in table.items() if char != target}
+
+
+# `str.lower()` lowercases U+0130 to two characters, `re` to "i"
+_PRE_FOLD = {0x130: "i"}
+_FOLD = _fold_table()
+
+
+def fold_case(text: str) -> str:
+    """
+    Fold the case of a text the way `re.IGNORECASE` compares characters.
+
+    Two strings of the same length are equal after folding exactly when an
+    `re.IGNORECASE` pattern of one matches the other, e.g. "ΟΔΟΣ" and "οδοσ",
+    or "I" and "ı".
+
+    Args:
+        text: Text to fold
+
+    Returns:
+        The folded text
+    """
+    if text.isascii():
+        return text.lower()
+    return text.translate(_PRE_FOLD).lower().translate(_FOLD)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton reporting whether any keyword occurs in a text.
+
+    Matching walks the text once, whatever the number of keywords. Uses the
+    `pyahocorasick` C extension when installed.
+    """
+
+    def __init__(self, keywords: List[str]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Case-folded (see `fold_case`), non-empty keywords
+        """
+        if ahocorasick is not None:
+            self.native = ahocorasick.Automaton()
+            for keyword in keywords:
+                self.native.add_word(keyword, keyword)
+            self.native.make_automaton()
+            return
+
+        self.native = None
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.terminal: List[bool] = [False]
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.terminal.append(False)
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.terminal[state] = True
+
+        # Breadth-first pass to set failure links; a state is terminal if any
+        # keyword ends there or at one of its suffixes
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.terminal[child] = self.terminal[child] or self.terminal[self.fail[child]]
+
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs in the case-folded `text`."""
+        if self.native is not None:
+            for _ in self.native.iter(text):
+                return True
+            return False
+
+        goto, fail, terminal = self.goto, self.fail, self.terminal
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if terminal[state]:
+                return True
+        return False
+
+
+class KeywordMatcher:
+    """Case-insensitive substring matcher for a list of keywords."""
+
+    def __init__(self, keywords: List[str]):
+        """
+        Compile the keywords.
+
+        Args:
+            keywords: Keywords to match
+        """
+        self.keywords = [k for k in keywords if k]
+        # An empty keyword matches any text, as it does in a regex alternation
+        self.match_all = len(self.keywords) < len(keywords)
+        self.automaton: Optional[KeywordAutomaton] = None
+        self.pattern: Optional[re.Pattern] = None
+        if len(self.keywords) >= AUTOMATON_MIN_KEYWORDS:
+            self.automaton = KeywordAutomaton([fold_case(k) for k in self.keywords])
+        else:
+            self.pattern = re.compile(r'|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs in `text`."""
+        if self.match_all:
+            return True
+        if self.automaton is not None:
+            return self.automaton.search(fold_case(text))
+        return self.pattern.search(text) is not None
+
+
+@lru_cache(maxsize=256)
+def compile_keywords(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """Compile a keyword list once and reuse the matcher."""
+    return KeywordMatcher(list(keywords))
+
+
+class CompiledFilter:
+    """A single include/exclude filter with its keywords compiled."""
+
+    def __init__(self, filter_type: FilterType, filter_field: FilterField, keywords: List[str]):
+        self.filter_type = filter_type
+        self.filter_field = filter_field
+        self.keywords = keywords
+        self.matcher = compile_keywords(tuple(keywords))
+
+    def apply(self, text: str) -> bool:
+        """
+        Apply the filter to the text of its field.
+
+        Returns:
+            True if the item should be included, False otherwise
+        """
+        # Skip processing for empty content
+        if not text or not self.keywords:
+            return self.filter_type == FilterType.Include
+
+        match_found = self.matcher.search(text)
+
+        # Return based on filter type
+        if self.filter_type == FilterType.Include:
+            return match_found
+        elif self.filter_type == FilterType.Exclude:
+            return not match_found
+        else:
+            raise ValueError(f"Unknown filter type: {self.filter_type}")
+
+
+class FeedFilter:
+    """All filters of a feed, compiled once when the config is loaded."""
+
+    def __init__(self, filters: List[Dict[str, Any]]):
+        """
+        Compile the filters of a feed.
+
+        Args:
+            filters: `filters` section of the feed configuration
+
+        Raises:
+            ValueError: If a filter has an unknown type or field
+        """
+        self.filters = [
+            CompiledFilter(FilterType.from_str(f["type"]), FilterField.from_str(f["field"]), f["keywords"])
+            for f in filters
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.filters)
+
+    def matches(self, item: Item) -> bool:
+        """
+        Check an item against all filters.
+
+        Args:
+            item: The item to filter
+
+        Returns:
+            True if the item passes every filter, False otherwise
+        """
+        texts: Dict[FilterField, str] = {}
+        for item_filter in self.filters:
+            field = item_filter.filter_field
+            if field not in texts:
+                texts[field] = field_text(item, field)
+            if not item_filter.apply(texts[field]):
+                return False
+        return True
+
+
+def field_text(item: Item, filter_field: FilterField) -> str:
+    """Get the text of an item that a filter on `filter_field` searches in."""
+    if filter_field == FilterField.Title:
+        return item.title
+    elif filter_field == FilterField.Article:
+        return item.cleaned
+    else:
+        raise ValueError(f"Unknown filter field: {filter_field}")
+
 
 def filter_entry(item: Item, filter_type: FilterType, filter_field: FilterField, keywords: List[str]) -> bool:
     """
@@ -19,29 +265,8 @@ def filter_entry(item: Item, filter_type: FilterType, filter_field: FilterField,
     Returns:
         True if the item should be included, False otherwise
     """
-    # Get the text to search in
-    if filter_field == FilterField.Title:
-        text = item.title
-    elif filter_field == FilterField.Article:
-        text = clean_html(item.article)
-    else:
-        raise ValueError(f"Unknown filter field: {filter_field}")
-        
-    # Skip processing for empty content
-    if not text or not keywords:
-        return filter_type == FilterType.Include
-    
-    # Create regex pattern and search
-    pattern = r'|'.join(map(re.escape, keywords))
-    match_found = re.search(pattern, text, re.IGNORECASE) is not None
-    
-    # Return based on filter type
-    if filter_type == FilterType.Include:
-        return match_found
-    elif filter_type == FilterType.Exclude:
-        return not match_found
-    else:
-        raise ValueError(f"Unknown filter type: {filter_type}")
+    item_filter = CompiledFilter(filter_type, filter_field, keywords)
+    return item_filter.apply(field_text(item, filter_field))
 
 
 def clean_html(html_content: str) -> str:
@@ -57,6 +282,14 @@ def clean_html(html_content: str) -> str:
     # Return empty string for empty content
     if not html_content or len(html_content.strip()) == 0:
         return ""
+
+    try:
+        return clean_html_lxml(html_content)
+    except Exception:
+        pass
+
+    # Only needed when the lxml fast path fails
+    from bs4 import BeautifulSoup
         
     try:
         # Parse HTML with lxml for better performance
@@ -89,4 +322,64 @@ def clean_html(html_content: str) -> str:
         for filter_tag in ["script", "style", "img", "a", "video", "audio", "iframe", "input"]:
             for tag in soup.find_all(filter_tag):
                 tag.decompose()
-        return soup.get_text(separator=' ', strip=True)
\ No newline at end of file
+        return soup.get_text(separator=' ', strip=True)
+
+
+def clean_html_lxml(html_content: str) -> str:
+    """
+    Extract paragraph text from HTML with lxml's pull parser.
+
+    Same output as the BeautifulSoup path of `clean_html`, without building a
+    BeautifulSoup tree: the document is fed in chunks, unwanted tags are
+    emptied as soon as they close and paragraphs are released once their
+    text is taken.
+
+    Args:
+        html_content: HTML content to clean
+
+    Returns:
+        Cleaned text for summarization
+    """
+    parser = etree.HTMLPullParser(events=("start", "end"), remove_comments=True, remove_pis=True)
+    lines: List[str] = []
+    open_targets: List[int] = []
+    removed_depth = 0
+
+    def read_events() -> None:
+        nonlocal removed_depth
+        for event, element in parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ""
+            if event == "start":
+                if tag in REMOVED_TAGS:
+                    removed_depth += 1
+                elif tag in TEXT_TAGS and not removed_depth:
+                    # Reserve the slot now to keep document order for nested tags
+                    open_targets.append(len(lines))
+                    lines.append("")
+                continue
+
+            if tag in REMOVED_TAGS:
+                removed_depth -= 1
+                element.clear(keep_tail=True)
+            elif tag in TEXT_TAGS and not removed_depth and open_targets:
+                lines[open_targets.pop()] = "".join(s.strip() for s in element.itertext())
+                if not open_targets:
+                    element.clear(keep_tail=True)
+
+    for offset in range(0, len(html_content), CHUNK_SIZE):
+        parser.feed(html_content[offset:offset + CHUNK_SIZE])
+        read_events()
+
+    # Closing ends the tags a truncated document left open
+    root = parser.close()
+    read_events()
+    lines = [line for line in lines if line]
+
+    # If no structured elements, use the entire text
+    if not lines:
+        if root is None:
+            return ""
+        return " ".join(s.strip() for s in root.itertext() if s.strip())
+
+    # Join with newlines between paragraphs
+    return '\n'.join(lines)
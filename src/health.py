@@ -0,0 +1,100 @@
+import time
+from typing import Any, Dict, List, Optional
+
+# Weight of the newest sample in the average latency
+LATENCY_SMOOTHING = 0.3
+
+
+class CircuitBreaker:
+    """
+    Per-feed health tracking with a circuit breaker.
+
+    The health of a feed is a dict stored in its state: consecutive
+    failures, last success and failure times, average fetch latency and the
+    last error. After `threshold` consecutive failures the circuit opens and
+    the feed is skipped for a cool-down that doubles with every further
+    failure, up to `max_cooldown`. Once the cool-down has passed, one probe
+    fetch is let through: a success closes the circuit, a failure opens it
+    again for longer.
+    """
+
+    def __init__(self, threshold: int = 3, cooldown: float = 6 * 3600, max_cooldown: float = 7 * 86400):
+        """
+        Initialize the breaker.
+
+        Args:
+            threshold: Consecutive failures that open the circuit, 0 to never skip feeds
+            cooldown: Seconds a feed is skipped after the circuit first opens
+            max_cooldown: Maximum seconds a feed is skipped
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+    def allow(self, health: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """
+        Check whether a feed may be fetched.
+
+        Args:
+            health: Health of the feed
+            now: Current time, defaults to `time.time()`
+
+        Returns:
+            False while the circuit is open, True otherwise (including probes)
+        """
+        now = time.time() if now is None else now
+        return now >= health.get("open_until", 0)
+
+    def record_success(self, health: Dict[str, Any], latency: float, now: Optional[float] = None) -> None:
+        """
+        Record a successful fetch, closing the circuit.
+
+        Args:
+            health: Health of the feed, updated in place
+            latency: Fetch time in seconds
+            now: Current time, defaults to `time.time()`
+        """
+        health["failures"] = 0
+        health["open_until"] = 0
+        health["last_success"] = time.time() if now is None else now
+        previous = health.get("latency")
+        health["latency"] = latency if previous is None else \
+            LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * previous
+
+    def record_failure(self, health: Dict[str, Any], error: str, now: Optional[float] = None) -> None:
+        """
+        Record a failed fetch, opening the circuit once the threshold is reached.
+
+        Args:
+            health: Health of the feed, updated in place
+            error: Error message
+            now: Current time, defaults to `time.time()`
+        """
+        now = time.time() if now is None else now
+        failures = health.get("failures", 0) + 1
+        health["failures"] = failures
+        health["last_failure"] = now
+        health["last_error"] = error[:500]
+        if self.threshold > 0 and failures >= self.threshold:
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** (failures - self.threshold))
+            health["open_until"] = now + cooldown
+
+    @staticmethod
+    def is_unhealthy(health: Dict[str, Any]) -> bool:
+        """Whether the last fetch of a feed failed."""
+        return health.get("failures", 0) > 0
+
+
+def unhealthy_report(healths: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    List the feeds whose last fetch failed, most failures first.
+
+    Args:
+        healths: Health of every feed by feed name
+
+    Returns:
+        One entry per unhealthy feed
+    """
+    report = [dict(health, name=name) for name, health in healths.items()
+              if CircuitBreaker.is_unhealthy(health)]
+    return sorted(report, key=lambda h: h.get("failures", 0), reverse=True)
@@ -0,0 +1,113 @@
+import argparse
+import csv
+import datetime
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+FIELDS = ["time", "run", "kind", "feed", "model", "prompt_tokens", "completion_tokens", "price"]
+
+
+class CostLedger:
+    """
+    Append-only CSV ledger of AI usage.
+
+    Every summary request adds a `request` row and every run ends with a
+    `run` row holding its totals. Rows are appended, never rewritten, so
+    recording costs does not depend on the size of the history.
+    """
+
+    def __init__(self, file_path: str, legacy_path: Optional[str] = None):
+        """
+        Initialize the ledger.
+
+        Args:
+            file_path: Path to the CSV ledger
+            legacy_path: Path to the Excel cost record to import once
+        """
+        self.file_path = file_path
+        self.legacy_path = legacy_path
+        self.run_id = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        self.logger = logging.getLogger()
+
+    def append(self, rows: List[Dict[str, Any]]) -> None:
+        """Append rows to the ledger, creating it with a header if needed."""
+        new_file = not os.path.exists(self.file_path)
+        if new_file:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, "a", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def record(self, kind: str, feed: str, model: str, prompt_tokens: int = 0,
+               completion_tokens: int = 0, price: float = 0) -> None:
+        """
+        Record one row of usage.
+
+        Args:
+            kind: `request` for a summary request, `run` for the totals of a run
+            feed: Name of the feed, or feeds, the usage belongs to
+            model: Model name
+            prompt_tokens: Prompt tokens used
+            completion_tokens: Completion tokens used
+            price: Price in USD
+        """
+        try:
+            if not os.path.exists(self.file_path):
+                self.migrate_legacy()
+            self.append([{
+                "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "run": self.run_id,
+                "kind": kind,
+                "feed": feed,
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "price": f"{price:.8f}",
+            }])
+        except OSError as e:
+            self.logger.error(f"Error recording cost: {str(e)}")
+
+    def migrate_legacy(self) -> None:
+        """Import the per-run totals of the Excel cost record, if one exists."""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            import pandas as pd
+            df = pd.read_excel(self.legacy_path)
+        except Exception as e:
+            self.logger.error(f"Error loading legacy cost record, skipping migration: {str(e)}")
+            return
+
+        # The old record only has a total per run, an exported ledger has every column
+        if "cost" in df.columns:
+            df = df.rename(columns={"cost": "price"}).assign(kind="run")
+        df = df.reindex(columns=FIELDS).fillna("").astype(str)
+        self.append(df.to_dict("records"))
+        self.logger.info(f"Migrated {len(df)} rows from legacy cost record: {self.legacy_path}")
+
+    def export_xlsx(self, xlsx_path: str) -> None:
+        """
+        Export the ledger to an Excel workbook.
+
+        Args:
+            xlsx_path: Path to the workbook to write
+        """
+        import pandas as pd
+
+        df = pd.read_csv(self.file_path)
+        df.to_excel(xlsx_path, index=False)
+        self.logger.info(f"Exported {len(df)} cost rows to: {xlsx_path}")
+
+
+if __name__ == "__main__":
+    from root import COST_LEDGER_PATH, COST_RECORD_PATH
+
+    parser = argparse.ArgumentParser(description="Export the AI cost ledger")
+    parser.add_argument("--ledger", default=COST_LEDGER_PATH, help="Path to the CSV ledger")
+    parser.add_argument("--xlsx", default=COST_RECORD_PATH, help="Path to the Excel workbook")
+    args = parser.parse_args()
+    CostLedger(args.ledger).export_xlsx(args.xlsx)
+    print(args.xlsx)
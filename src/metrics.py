@@ -0,0 +1,177 @@
+import json
+import logging
+import math
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, DefaultDict, Dict, Iterator, List, Optional
+
+logger = logging.getLogger()
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Metrics:
+    """
+    Timers, counters and latency samples of one run, overall and per feed.
+
+    Stage timers add up the wall time spent in each pipeline stage (fetch,
+    parse, filter, clean, summarize, render, ...). Counters track volumes
+    such as bytes fetched, entries in and out, cache hits and tokens.
+    Latency samples, such as LLM request durations, are reported as
+    percentiles.
+    """
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self.started = time.time()
+        self.stage_seconds: DefaultDict[str, float] = defaultdict(float)
+        self.stage_calls: DefaultDict[str, int] = defaultdict(int)
+        self.counters: DefaultDict[str, float] = defaultdict(float)
+        self.samples: DefaultDict[str, List[float]] = defaultdict(list)
+        self.feeds: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.sections: Dict[str, Any] = {}
+
+    def reset(self) -> None:
+        """Start over with empty metrics, e.g. for the next cycle of the daemon."""
+        self.__init__()
+
+    def add_time(self, stage: str, seconds: float, feed: Optional[str] = None) -> None:
+        """
+        Add time spent in a stage.
+
+        Args:
+            stage: Stage name
+            seconds: Wall time in seconds
+            feed: Name of the feed the time belongs to, if any
+        """
+        self.stage_seconds[stage] += seconds
+        self.stage_calls[stage] += 1
+        if feed:
+            self.feeds[feed][f"{stage}_seconds"] += seconds
+
+    @contextmanager
+    def timer(self, stage: str, feed: Optional[str] = None) -> Iterator[None]:
+        """Time the enclosed block as part of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start, feed)
+
+    def count(self, name: str, value: float = 1, feed: Optional[str] = None) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name: Counter name
+            value: Amount to add
+            feed: Name of the feed the amount belongs to, if any
+        """
+        self.counters[name] += value
+        if feed:
+            self.feeds[feed][name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample, e.g. the latency of a request in seconds."""
+        self.samples[name].append(value)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Build the run report.
+
+        Returns:
+            A JSON-serializable dict of all metrics
+        """
+        hits = self.counters.get("cache_hits", 0)
+        lookups = hits + self.counters.get("cache_misses", 0)
+        return {
+            "started": self.started,
+            "duration": time.time() - self.started,
+            "stages": {
+                stage: {"seconds": round(seconds, 6), "calls": self.stage_calls[stage]}
+                for stage, seconds in sorted(self.stage_seconds.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "cache_hit_ratio": hits / lookups if lookups else None,
+            "latency": {
+                name: dict({"count": len(values), "max": max(values)},
+                           **{f"p{p}": percentile(values, p) for p in PERCENTILES})
+                for name, values in sorted(self.samples.items()) if values
+            },
+            "feeds": {feed: dict(values) for feed, values in sorted(self.feeds.items())},
+            **self.sections,
+        }
+
+    def prometheus(self, prefix: str = "rss_master") -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix: Prefix of all metric names
+
+        Returns:
+            The metrics as text
+        """
+        lines = [f"# TYPE {prefix}_stage_seconds_total counter"]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds}'
+                  for stage, seconds in sorted(self.stage_seconds.items())]
+        lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+        lines += [f'{prefix}_stage_calls_total{{stage="{stage}"}} {calls}'
+                  for stage, calls in sorted(self.stage_calls.items())]
+
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+
+        for name, values in sorted(self.samples.items()):
+            lines.append(f"# TYPE {prefix}_{name}_seconds summary")
+            lines += [f'{prefix}_{name}_seconds{{quantile="{p / 100}"}} {percentile(values, p)}'
+                      for p in PERCENTILES]
+            lines.append(f"{prefix}_{name}_seconds_sum {sum(values)}")
+            lines.append(f"{prefix}_{name}_seconds_count {len(values)}")
+
+        lines.append(f"# TYPE {prefix}_feed gauge")
+        for feed, values in sorted(self.feeds.items()):
+            name = feed.replace("\\", "\\\\").replace('"', '\\"')
+            lines += [f'{prefix}_feed{{feed="{name}",metric="{metric}"}} {value}'
+                      for metric, value in sorted(values.items())]
+        return "\n".join(lines) + "\n"
+
+    def write(self, report_path: str, prometheus_path: str = "") -> None:
+        """
+        Write the run report, and the Prometheus metrics if a path is given.
+
+        Args:
+            report_path: Path of the JSON report
+            prometheus_path: Path of the Prometheus text file, empty to skip
+        """
+        try:
+            os.makedirs(os.path.dirname(report_path), exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            logger.info(f"Run report saved to: {report_path}")
+
+            if prometheus_path:
+                # Write and rename, so a scraper never reads a partial file
+                temp_path = f"{prometheus_path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    f.write(self.prometheus())
+                os.replace(temp_path, prometheus_path)
+                logger.info(f"Prometheus metrics saved to: {prometheus_path}")
+        except OSError as e:
+            logger.error(f"Error saving metrics: {str(e)}")
+
+
+# Shared by the pipeline and the helpers it calls
+metrics = Metrics()
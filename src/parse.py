@@ -0,0 +1,250 @@
+import calendar
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from src.const import Item
+from src.filter import FeedFilter
+from src.util import content_hash, get_env_int, md5hash_6
+
+logger = logging.getLogger()
+
+# Compiled filters of this process, keyed by feed name and filter configuration
+_feed_filters: Dict[Tuple[str, str], FeedFilter] = {}
+
+
+@dataclass
+class ParsedFeed:
+    """
+    Compact result of parsing and filtering one feed download.
+
+    This is what a parse worker sends back to the main process: the channel
+    metadata, the id and content hash of every entry in feed order, only
+    the new or changed entries that passed filtering, and the seconds spent
+    in each stage. Cleaning done by article filters counts as filtering.
+    `published` holds the publish times of all dated entries. `stopped_at`
+    is the id of the already processed entry parsing stopped at, if it
+    stopped early there.
+    """
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    feed: Dict[str, Any] = field(default_factory=dict)
+    entries: List[Tuple[str, str, bool]] = field(default_factory=list)
+    items: List[Item] = field(default_factory=list)
+    published: List[float] = field(default_factory=list)
+    stopped_at: str = ""
+    error: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def filters_hash(rss: Dict[str, Any]) -> str:
+    """Hash of the feed's filter configuration."""
+    return content_hash(json.dumps(rss.get("filters", []), sort_keys=True, ensure_ascii=False))
+
+
+def get_feed_filter(rss: Dict[str, Any]) -> FeedFilter:
+    """
+    Get the compiled filters of a feed, compiling them once per process.
+
+    Args:
+        rss: RSS feed configuration
+
+    Returns:
+        The compiled filters
+
+    Raises:
+        ValueError: If the feed's filter configuration is invalid
+    """
+    key = (rss["name"], filters_hash(rss))
+    feed_filter = _feed_filters.get(key)
+    if feed_filter is None:
+        feed_filter = _feed_filters[key] = FeedFilter(rss.get("filters", []))
+    return feed_filter
+
+
+def entry_data(entry: Any) -> Dict[str, Any]:
+    """
+    Normalize a feedparser entry into the fields of an `Item`.
+
+    Args:
+        entry: Parsed feed entry
+
+    Returns:
+        Keyword arguments for `Item`
+    """
+    # Extract ID or generate one if missing
+    id_ = entry.get("id", entry.get(
+        "link", md5hash_6(entry.get("title", "No Title"))))
+
+    # Get article content if available
+    article = ""
+    if not entry.get("media_content", ""):
+        article = entry.get("summary", "") or entry.get(
+            "description", "") or ""
+
+    return {
+        "id": id_,
+        "guid": id_,
+        "link": entry.get("link", ""),
+        "title": entry.get("title", "No Title"),
+        "updated": entry.get("updated", ""),
+        "article": article,
+        "media_thumbnail": entry.get("media_thumbnail"),
+        "media_content": entry.get("media_content"),
+        "published": "",
+        "summary": ""
+    }
+
+
+def drain_entries(feed: Any) -> Iterator[Any]:
+    """
+    Take the raw entries out of a parsed feed, one at a time.
+
+    Each entry is dropped from the feed as it is yielded, so it can be
+    freed as soon as it has been normalized.
+
+    Args:
+        feed: Feed parsed by feedparser, emptied of its entries
+
+    Yields:
+        Parsed feed entries, in feed order
+    """
+    entries = feed.pop("entries", [])
+    entries.reverse()
+    while entries:
+        yield entries.pop()
+
+
+def new_items(entries: Iterable[Any], seen: Dict[str, str], result: "ParsedFeed",
+              max_items: int = 0, stop_at_seen: bool = False) -> Iterator[Item]:
+    """
+    Normalize entries into items, skipping the ones processed in earlier runs.
+
+    The id and content hash of every entry, and the publish times, are
+    recorded in `result` along the way. Stopping early stops reading a
+    streamed document.
+
+    Args:
+        entries: Parsed feed entries
+        seen: Content hash of every reusable entry, by entry id
+        result: Parse result to record the entries in
+        max_items: Stop after this many entries, 0 to read all of them
+        stop_at_seen: Stop at the first entry processed in an earlier run,
+            recording its id in `result.stopped_at`
+
+    Yields:
+        Items of the new or changed entries
+    """
+    ids = set()
+    for entry in entries:
+        try:
+            data = entry_data(entry)
+            id_ = data["id"]
+
+            # Skip duplicate ids and entries processed in an earlier run
+            if id_ in ids:
+                continue
+            ids.add(id_)
+            hash_ = content_hash(data["title"], data["link"], data["article"])
+            unchanged = seen.get(id_) == hash_
+            result.entries.append((id_, hash_, unchanged))
+            published = entry.get("published_parsed") or entry.get("updated_parsed")
+            if published:
+                result.published.append(float(calendar.timegm(published)))
+            if not unchanged:
+                yield Item(**data)
+            elif stop_at_seen:
+                result.stopped_at = id_
+                return
+
+        except Exception as e:
+            logger.warning(f"Error processing entry: {str(e)}")
+
+        if max_items and len(result.entries) >= max_items:
+            return
+
+
+def feed_parser(rss: Dict[str, Any]) -> str:
+    """Name of the parser backend of a feed, `feedparser` or `lxml`."""
+    return rss.get("parser") or os.getenv("FEED_PARSER", "feedparser")
+
+
+def parse_feed(content: bytes, headers: Dict[str, str], rss: Dict[str, Any],
+               seen: Dict[str, str]) -> ParsedFeed:
+    """
+    Parse a downloaded feed, then clean and filter its new entries.
+
+    This is the CPU-bound stage of processing a feed. It only takes and
+    returns picklable values, so it can run in a worker process. Entries
+    flow through normalization and filtering one at a time, and only the
+    items that pass are kept.
+
+    Only the feed's first `max_items` entries are read, and with
+    `stop_at_seen` reading stops at the first entry processed in an earlier
+    run. With the `lxml` backend the document itself is read incrementally,
+    so the rest of it is not even parsed.
+
+    Args:
+        content: Raw feed document
+        headers: Lowercase response headers
+        rss: RSS feed configuration
+        seen: Content hash of every entry that can be reused from an earlier
+            run, by entry id
+
+    Returns:
+        The parsed feed
+    """
+    start = time.perf_counter()
+    if feed_parser(rss) == "lxml":
+        from src.stream import StreamParser
+
+        entries = stream = StreamParser(content)
+        channel = stream.channel
+    else:
+        import feedparser
+
+        feed = feedparser.parse(content, response_headers=headers)
+        if feed.bozo and feed.get("bozo_exception"):
+            return ParsedFeed(status=0, headers=headers, error=str(feed.get("bozo_exception", "")),
+                              timings={"parse": time.perf_counter() - start})
+        channel = feed.feed
+        entries = drain_entries(feed)
+        del feed
+        stream = None
+
+    feed_filter = get_feed_filter(rss)
+    result = ParsedFeed(status=200, headers=headers, feed=channel)
+    filter_seconds = clean_seconds = 0.0
+    max_items = int(rss.get("max_items") or 0)
+    stop_at_seen = bool(rss.get("stop_at_seen", get_env_int("STOP_AT_SEEN", 0)))
+
+    for item in new_items(entries, seen, result, max_items, stop_at_seen):
+        try:
+            filter_start = time.perf_counter()
+            passed = feed_filter.matches(item)
+            filter_seconds += time.perf_counter() - filter_start
+            if passed:
+                # Clean text to summarize here, so the main process receives
+                # it with the item
+                if rss.get("use_chatgpt", False):
+                    clean_start = time.perf_counter()
+                    item.cleaned
+                    clean_seconds += time.perf_counter() - clean_start
+                result.items.append(item)
+
+        except Exception as e:
+            logger.warning(f"Error processing entry: {str(e)}")
+
+    if stream is not None and stream.error:
+        return ParsedFeed(status=0, headers=headers, error=stream.error,
+                          timings={"parse": time.perf_counter() - start})
+
+    result.timings = {
+        "parse": time.perf_counter() - start - filter_seconds - clean_seconds,
+        "filter": filter_seconds,
+        "clean": clean_seconds,
+    }
+    return result
@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import os
+from typing import Any, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+logger = logging.getLogger()
+
+
+class TemplateRenderer:
+    """
+    Renders Jinja templates straight into output files.
+
+    One environment is shared by all feeds, so each template is read and
+    compiled once per run. A bytecode cache directory keeps the compiled
+    templates across runs. Output is streamed to the file as it is
+    rendered, never held in memory as a single string.
+
+    Files are replaced atomically, and left untouched when the rendered
+    content is identical to what is already on disk.
+    """
+
+    def __init__(self, template_dir: str, bytecode_cache_dir: Optional[str] = None):
+        """
+        Initialize the renderer.
+
+        Args:
+            template_dir: Directory holding the templates
+            bytecode_cache_dir: Directory to cache compiled templates in, None to disable
+        """
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+
+        # Templates do not change during a run
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir, encoding="utf-8"),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,
+        )
+
+    def render_to_file(self, template_name: str, path: str, digest: str = "",
+                       **context: Any) -> Tuple[str, bool]:
+        """
+        Render a template into a file, unless the file already has that content.
+
+        The output is streamed into a temporary file next to `path` while
+        being hashed, then renamed over `path` if the content changed, so
+        readers never see a partially written file.
+
+        Args:
+            template_name: Template file name, relative to the template directory
+            path: Output file path
+            digest: Digest of the current file content if known, to skip reading it
+            **context: Template variables
+
+        Returns:
+            Digest of the rendered content, and whether the file was written
+        """
+        template = self.env.get_template(template_name)
+        hasher = hashlib.sha256()
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                for chunk in template.generate(**context):
+                    data = chunk.encode("utf-8")
+                    hasher.update(data)
+                    f.write(data)
+            new_digest = hasher.hexdigest()
+
+            if os.path.exists(path) and new_digest == (digest or file_digest(path)):
+                logger.debug(f"Unchanged, not rewriting: {path}")
+                return new_digest, False
+            os.replace(temp_path, path)
+            return new_digest, True
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 digest of a file's content."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
@@ -0,0 +1,255 @@
+import heapq
+import itertools
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Length in seconds of each sy:updatePeriod
+UPDATE_PERIODS = {
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 7 * 86400,
+    "monthly": 30 * 86400,
+    "yearly": 365 * 86400,
+}
+
+# Publish timestamps kept per feed
+HISTORY_SIZE = 50
+
+# Only publishes this recent count towards the update rate
+HISTORY_WINDOW = 30 * 86400
+
+# Share of the average time between two publishes to wait between polls
+POLL_FACTOR = 0.5
+
+# A feed is due this share of its interval early, so a slightly early
+# scheduled run does not postpone it to the next one
+DUE_SLACK = 0.1
+
+
+def record_published(state: Dict[str, Any], timestamps: Iterable[float], now: Optional[float] = None) -> None:
+    """
+    Add entry publish times to the history of a feed.
+
+    Args:
+        state: Stored state of the feed, updated in place
+        timestamps: Publish times of the entries in the latest download
+        now: Current time, defaults to `time.time()`
+    """
+    now = time.time() if now is None else now
+    # Ignore dates in the future, they are most likely wrong
+    history = set(state.get("published", []))
+    history.update(t for t in timestamps if t <= now + 86400)
+    state["published"] = sorted(history)[-HISTORY_SIZE:]
+
+
+def publish_interval(timestamps: List[float], now: Optional[float] = None) -> Optional[float]:
+    """
+    Estimate the average time between two publishes of a feed.
+
+    The rate is the number of recent publishes over the time from the
+    oldest of them until now, so a feed that has gone quiet since its
+    last publish is estimated as slower and slower.
+
+    Args:
+        timestamps: Sorted publish times
+        now: Current time, defaults to `time.time()`
+
+    Returns:
+        Seconds between publishes, infinity if nothing was published
+        recently, or None if there is too little history
+    """
+    if len(timestamps) < 2:
+        return None
+    now = time.time() if now is None else now
+    recent = [t for t in timestamps if t >= now - HISTORY_WINDOW]
+    if not recent:
+        return float("inf")
+    return max(now - recent[0], 0) / len(recent)
+
+
+def feed_ttl(channel: Dict[str, Any]) -> Optional[float]:
+    """
+    Read the poll interval a feed asks for in its channel metadata.
+
+    `<ttl>` is the number of minutes the feed may be cached, and
+    `sy:updatePeriod`/`sy:updateFrequency` say how often it is updated.
+
+    Args:
+        channel: Channel metadata parsed by feedparser
+
+    Returns:
+        The longest advertised interval in seconds, or None if there is none
+    """
+    hints = []
+    try:
+        ttl = float(channel.get("ttl") or 0) * 60
+        if ttl > 0:
+            hints.append(ttl)
+    except (TypeError, ValueError):
+        pass
+
+    period = UPDATE_PERIODS.get(str(channel.get("sy_updateperiod") or "").strip().lower())
+    if period:
+        try:
+            frequency = max(1, int(channel.get("sy_updatefrequency") or 1))
+        except (TypeError, ValueError):
+            frequency = 1
+        hints.append(period / frequency)
+    return max(hints) if hints else None
+
+
+class PollPolicy:
+    """
+    Decides how long to wait before polling a feed again.
+
+    An `interval` (in minutes) in the feed's config always wins. Otherwise
+    the interval follows the feed's publish history, polling twice per
+    average time between publishes, or is the default for feeds without
+    enough dated entries. It is lengthened to the interval the feed
+    advertises and kept within the minimum and maximum.
+    """
+
+    def __init__(self, default: float = 3600, minimum: float = 600, maximum: float = 86400):
+        """
+        Initialize the policy.
+
+        Args:
+            default: Interval in seconds for feeds without any hint
+            minimum: Shortest interval in seconds
+            maximum: Longest interval in seconds
+        """
+        self.default = default
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+
+    def interval(self, rss: Dict[str, Any], state: Dict[str, Any]) -> float:
+        """
+        Compute the poll interval of a feed.
+
+        Args:
+            rss: RSS feed configuration
+            state: Stored state of the feed
+
+        Returns:
+            Seconds between two polls
+        """
+        if rss.get("interval"):
+            return float(rss["interval"]) * 60
+
+        published = publish_interval(state.get("published", []))
+        interval = self.default if published is None else published * POLL_FACTOR
+        interval = max(interval, state.get("ttl") or 0)
+        return min(self.maximum, max(self.minimum, interval))
+
+    def next_due(self, rss: Dict[str, Any], state: Dict[str, Any], now: Optional[float] = None) -> float:
+        """
+        Compute when a feed that was just polled is due again.
+
+        A feed whose circuit is open is not due before its cool-down ends.
+
+        Args:
+            rss: RSS feed configuration
+            state: Stored state of the feed
+            now: Time of the poll, defaults to `time.time()`
+
+        Returns:
+            Timestamp of the next poll
+        """
+        now = time.time() if now is None else now
+        due = now + self.interval(rss, state)
+        return max(due, state.get("health", {}).get("open_until", 0))
+
+    def schedule(self, rss: Dict[str, Any], state: Dict[str, Any], now: Optional[float] = None) -> None:
+        """
+        Store the next poll time of a feed that was just polled in its state.
+
+        Args:
+            rss: RSS feed configuration
+            state: Stored state of the feed, updated in place
+            now: Time of the poll, defaults to `time.time()`
+        """
+        now = time.time() if now is None else now
+        state["next_poll"] = self.next_due(rss, state, now)
+        state["poll_interval"] = state["next_poll"] - now
+
+    def is_due(self, state: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """
+        Check whether a feed should be polled.
+
+        Args:
+            state: Stored state of the feed
+            now: Current time, defaults to `time.time()`
+
+        Returns:
+            True if the feed was never scheduled or its next poll time has come
+        """
+        now = time.time() if now is None else now
+        slack = DUE_SLACK * state.get("poll_interval", 0)
+        return now >= state.get("next_poll", 0) - slack
+
+
+class FeedScheduler:
+    """
+    Priority queue of feed names ordered by the time they are next due.
+
+    Rescheduling or removing a feed leaves its old heap entry in place; stale
+    entries are recognized by their sequence number and dropped when they
+    reach the top.
+    """
+
+    def __init__(self):
+        """Initialize an empty schedule."""
+        self._heap: List[Tuple[float, int, str]] = []
+        self._current: Dict[str, int] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._current
+
+    def schedule(self, name: str, due: float) -> None:
+        """
+        Schedule a feed, replacing its previous due time.
+
+        Args:
+            name: Feed name
+            due: Timestamp the feed is due at
+        """
+        seq = next(self._counter)
+        self._current[name] = seq
+        heapq.heappush(self._heap, (due, seq, name))
+
+    def remove(self, name: str) -> None:
+        """Remove a feed from the schedule."""
+        self._current.pop(name, None)
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._current.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        """Return the earliest due time, or None if nothing is scheduled."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """
+        Remove and return every feed that is due.
+
+        Args:
+            now: Current time, defaults to `time.time()`
+
+        Returns:
+            Names of the due feeds, earliest first
+        """
+        now = time.time() if now is None else now
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, name = heapq.heappop(self._heap)
+            del self._current[name]
+            due.append(name)
+            self._drop_stale()
+        return due
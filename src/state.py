@@ -0,0 +1,110 @@
+import atexit
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+# State fields that change on every poll: the feed's health and next poll time
+VOLATILE_KEYS = ("health", "next_poll", "poll_interval")
+
+
+class FeedStateStore:
+    """
+    Persistent per-feed state (HTTP validators, entry index, ...) keyed by the feed name.
+
+    The fields in `VOLATILE_KEYS` change on every poll, even when the feed
+    itself did not change, so they are kept apart from the per-feed files in
+    one status file, written by `flush`. A feed's file is then only rewritten
+    with new content when its entries or validators change.
+    """
+
+    def __init__(self, dir_path: str, status_path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            dir_path: Directory holding one JSON document per feed
+            status_path: JSON document holding the volatile fields of all feeds,
+                None to keep them in the per-feed documents
+        """
+        self.dir_path = dir_path
+        self.status_path = status_path
+        self.status: Optional[Dict[str, Dict[str, Any]]] = None
+        self.dirty = False
+        self.logger = logging.getLogger()
+        atexit.register(self.flush)
+
+    def path(self, name: str) -> str:
+        """Return the state file path of a feed."""
+        return os.path.join(self.dir_path, f"{name}.json")
+
+    def read(self, path: str) -> Dict[str, Any]:
+        """Read a JSON document, or return an empty dict if it is missing or invalid."""
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error loading feed state {path}, starting fresh: {str(e)}")
+            return {}
+
+    def write(self, path: str, data: Dict[str, Any]) -> None:
+        """Write a JSON document through a temporary file, leaving an unchanged file alone."""
+        try:
+            text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    if f.read() == text:
+                        return
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+            self.logger.debug(f"Feed state saved: {path}")
+        except Exception as e:
+            self.logger.error(f"Error saving feed state {path}: {str(e)}")
+
+    def load_status(self) -> Dict[str, Dict[str, Any]]:
+        """Load the volatile fields of all feeds once."""
+        if self.status is None:
+            self.status = self.read(self.status_path) if self.status_path else {}
+        return self.status
+
+    def load(self, name: str) -> Dict[str, Any]:
+        """
+        Load the state of a feed.
+
+        Args:
+            name: Feed name from the config
+
+        Returns:
+            The stored state, or an empty dict if there is none
+        """
+        state = self.read(self.path(name))
+        if self.status_path:
+            state.update(self.load_status().get(name, {}))
+        return state
+
+    def save(self, name: str, state: Dict[str, Any]) -> None:
+        """
+        Save the state of a feed.
+
+        The volatile fields are only written by the next `flush`.
+
+        Args:
+            name: Feed name from the config
+            state: State to store
+        """
+        if self.status_path:
+            self.load_status()[name] = {key: state[key] for key in VOLATILE_KEYS if key in state}
+            self.dirty = True
+            state = {key: value for key, value in state.items() if key not in VOLATILE_KEYS}
+        self.write(self.path(name), state)
+
+    def flush(self) -> None:
+        """Write the volatile fields of all feeds, if any changed."""
+        if self.dirty and self.status_path:
+            self.write(self.status_path, self.status)
+            self.dirty = False
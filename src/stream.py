@@ -0,0 +1,183 @@
+import calendar
+import datetime
+import email.utils
+import io
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from lxml import etree
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+RSS1 = "{http://purl.org/rss/1.0/}"
+RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+SY = "{http://purl.org/rss/1.0/modules/syndication/}"
+
+ENTRY_TAGS = frozenset(["item", RSS1 + "item", ATOM + "entry"])
+CHANNEL_TAGS = frozenset(["channel", RSS1 + "channel", ATOM + "feed"])
+
+# Channel elements kept as feed metadata, by the key feedparser uses
+CHANNEL_FIELDS = {
+    "title": "title", RSS1 + "title": "title", ATOM + "title": "title",
+    "link": "link", RSS1 + "link": "link",
+    "ttl": "ttl",
+    SY + "updatePeriod": "sy_updateperiod",
+    SY + "updateFrequency": "sy_updatefrequency",
+}
+
+
+def parse_date(text: str) -> Optional[float]:
+    """
+    Parse an RFC 822 (RSS) or ISO 8601 (Atom) date.
+
+    Args:
+        text: Date as written in the feed
+
+    Returns:
+        Unix timestamp, or None if the date cannot be parsed
+    """
+    if not text:
+        return None
+    parsed = email.utils.parsedate_tz(text)
+    if parsed:
+        return float(email.utils.mktime_tz(parsed))
+    try:
+        value = text.strip().replace("Z", "+00:00").replace("z", "+00:00")
+        date = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if date.tzinfo is None:
+        return float(calendar.timegm(date.timetuple()))
+    return date.timestamp()
+
+
+def gmtime(timestamp: Optional[float]) -> Optional[time.struct_time]:
+    """Convert a timestamp to a UTC struct_time, like feedparser's `published_parsed`."""
+    return time.gmtime(timestamp) if timestamp is not None else None
+
+
+def child_text(elem: Any, *tags: str) -> str:
+    """Return the stripped text of the first of `tags` found among the children of `elem`."""
+    for tag in tags:
+        child = elem.find(tag)
+        if child is not None and child.text:
+            return child.text.strip()
+    return ""
+
+
+def atom_text(elem: Any) -> str:
+    """Return the content of an Atom text construct, serializing XHTML content."""
+    if elem.get("type") != "xhtml":
+        return (elem.text or "").strip()
+    div = elem[0] if len(elem) else elem
+    parts = [div.text or ""]
+    parts += [etree.tostring(child, encoding="unicode") for child in div]
+    return "".join(parts).strip()
+
+
+def media(elem: Any, tag: str) -> Optional[List[Dict[str, str]]]:
+    """Collect the attributes of every media element with `tag`, like feedparser does."""
+    found = [dict(child.attrib) for child in elem.iter(tag)]
+    return found or None
+
+
+def rss_entry(elem: Any) -> Dict[str, Any]:
+    """Normalize an RSS 2.0 or RSS 1.0 `<item>` into feedparser's entry keys."""
+    ns = RSS1 if elem.tag.startswith(RSS1) else ""
+    entry: Dict[str, Any] = {}
+    id_ = child_text(elem, "guid") or elem.get(RDF + "about", "")
+    if id_:
+        entry["id"] = id_
+    link = child_text(elem, ns + "link")
+    if link:
+        entry["link"] = link
+    entry["title"] = child_text(elem, ns + "title")
+    entry["summary"] = child_text(elem, ns + "description", CONTENT + "encoded")
+    published = child_text(elem, "pubDate", DC + "date")
+    entry["updated"] = child_text(elem, DC + "date") or published
+    entry["published_parsed"] = gmtime(parse_date(published))
+    entry["media_content"] = media(elem, MEDIA + "content")
+    entry["media_thumbnail"] = media(elem, MEDIA + "thumbnail")
+    return entry
+
+
+def atom_entry(elem: Any) -> Dict[str, Any]:
+    """Normalize an Atom `<entry>` into feedparser's entry keys."""
+    entry: Dict[str, Any] = {}
+    id_ = child_text(elem, ATOM + "id")
+    if id_:
+        entry["id"] = id_
+    for link in elem.iterfind(ATOM + "link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            entry["link"] = link.get("href")
+            break
+    title = elem.find(ATOM + "title")
+    entry["title"] = atom_text(title) if title is not None else ""
+    content = elem.find(ATOM + "summary")
+    if content is None:
+        content = elem.find(ATOM + "content")
+    entry["summary"] = atom_text(content) if content is not None else ""
+    updated = child_text(elem, ATOM + "updated", ATOM + "published")
+    entry["updated"] = updated
+    entry["published_parsed"] = gmtime(parse_date(child_text(elem, ATOM + "published") or updated))
+    entry["media_content"] = media(elem, MEDIA + "content")
+    entry["media_thumbnail"] = media(elem, MEDIA + "thumbnail")
+    return entry
+
+
+class StreamParser:
+    """
+    Incremental RSS/Atom parser built on lxml's `iterparse`.
+
+    Entries are normalized into dicts with feedparser's keys and yielded
+    one at a time, and each element is cleared once it has been read, so
+    memory is bounded by one entry whatever the size of the document.
+    Stopping the iteration stops reading the document. The channel
+    metadata is collected in `channel` as it is read.
+
+    Unlike feedparser, article HTML is passed through as published, without
+    sanitizing.
+    """
+
+    def __init__(self, content: bytes):
+        """
+        Initialize the parser.
+
+        Args:
+            content: Raw feed document
+        """
+        self.content = content
+        self.channel: Dict[str, Any] = {}
+        self.error = ""
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        context = etree.iterparse(io.BytesIO(self.content), events=("end",),
+                                  resolve_entities=False, no_network=True)
+        try:
+            for _, elem in context:
+                tag = elem.tag
+                if tag in ENTRY_TAGS:
+                    entry = atom_entry(elem) if tag.startswith(ATOM) else rss_entry(elem)
+                    # Free the entry and everything read before it
+                    elem.clear(keep_tail=True)
+                    parent = elem.getparent()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+                    yield entry
+                elif tag in CHANNEL_FIELDS or tag == ATOM + "link":
+                    self.read_channel_field(elem)
+        except etree.XMLSyntaxError as e:
+            self.error = str(e)
+
+    def read_channel_field(self, elem: Any) -> None:
+        """Store a channel-level element in the feed metadata."""
+        parent = elem.getparent()
+        if parent is None or parent.tag not in CHANNEL_TAGS:
+            return
+        if elem.tag == ATOM + "link":
+            if elem.get("rel", "alternate") == "alternate" and elem.get("href"):
+                self.channel.setdefault("link", elem.get("href"))
+            return
+        self.channel.setdefault(CHANNEL_FIELDS[elem.tag], (elem.text or "").strip())
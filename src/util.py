@@ -8,7 +8,6 @@ import time
 import xml.etree.ElementTree as ET
 from typing import Union
 
-import opml
 import yaml
 
 sys.path.insert(0, os.path.abspath(
@@ -75,12 +74,29 @@ def init_dirs():
         os.makedirs(CONFIG_PATH)
 
 
+def get_env_int(name: str, default: int) -> int:
+    """Read an integer from the environment, falling back to `default`."""
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
 def md5hash_6(text: str):
     m = hashlib.md5()
     m.update(text.encode("utf-8"))
     return m.hexdigest()[:6]
 
 
+def content_hash(*parts: str) -> str:
+    """Full md5 digest over several text parts, used to detect changed content."""
+    m = hashlib.md5()
+    for part in parts:
+        m.update((part or "").encode("utf-8"))
+        m.update(b"\0")
+    return m.hexdigest()
+
+
 def convert_yaml_to_opml(yaml_path, opml_path):
     with open(yaml_path, 'r') as file:
         data = yaml.safe_load(file)
@@ -105,6 +121,8 @@ def convert_yaml_to_opml(yaml_path, opml_path):
 
 
 def convert_opml_to_yaml(opml_file, yaml_file):
+    import opml
+
     # 使用 opml 库解析 OPML 文件
     with open(opml_file, "r") as f:
         opml_data = opml.parse(f)